@@ -1,13 +1,22 @@
+import time
+STARTUP_TIME = time.perf_counter()  # Before the heavy imports, for the startup profile
+
 from ursina import *
 from ursina.prefabs.health_bar import HealthBar
+from panda3d.core import AudioSound, Geom, GeomNode, GeomTriangles, GeomVertexArrayFormat, GeomVertexData, GeomVertexFormat, InternalName
 import numpy as np
-from scipy.ndimage import gaussian_filter
 import random
+import math
 from threading import Thread
-import time
 import os
+import json
+import hashlib
+import argparse
 import logging
 import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
 
 # Configure logging
 logging.basicConfig(level=logging.ERROR, format='%(levelname)s: %(message)s')
@@ -15,28 +24,57 @@ logging.basicConfig(level=logging.ERROR, format='%(levelname)s: %(message)s')
 # Disable logging for comtypes to prevent TTS-related errors
 logging.getLogger('comtypes').setLevel(logging.ERROR)
 
-# Initialize Ursina
-app = Ursina()
+# Ursina application and text-to-speech thread, created by bootstrap()
+app = None
+tts_engine = None
 
 # Global game instance
 game = None
 
+# Time spent in each startup phase, from launch to the first rendered frame. Phases are
+# marked as they end; --profile-startup prints the breakdown
+class StartupProfile:
+    def __init__(self, start):
+        self.start = start
+        self.last = start
+        self.phases = []  # (name, ms)
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, (now - self.last) * 1000))
+        self.last = now
+
+    def total(self):
+        return (self.last - self.start) * 1000
+
+    def report(self):
+        lines = [f'  {name:<20}{ms:9.1f} ms' for name, ms in self.phases]
+        lines.append(f'  {"total":<20}{self.total():9.1f} ms')
+        return '\n'.join(['Startup profile:'] + lines)
+
+startup_profile = StartupProfile(STARTUP_TIME)
+
 # Text-to-Speech Engine Initialization with Queue
 class TTSEngine:
     def __init__(self):
         self.queue = queue.Queue()
+        self.engine = None
+        self.failed = False
+        self.thread = Thread(target=self.run_engine)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def run_engine(self):
+        # The speech driver starts on this thread, so a slow one doesn't hold up startup.
+        # Lines queued meanwhile are spoken once it is ready
         try:
             import pyttsx3
             self.engine = pyttsx3.init()
             self.engine.setProperty('rate', 150)  # Slower speech rate for dramatic effect
-            self.thread = Thread(target=self.run_engine)
-            self.thread.daemon = True
-            self.thread.start()
         except Exception as e:
             print(f"TTS Initialization Error: {e}")
-            self.engine = None
-
-    def run_engine(self):
+            self.failed = True
+            return
         while True:
             text = self.queue.get()
             if text is None:
@@ -53,18 +91,50 @@ class TTSEngine:
                 logging.error(f"TTS Error during speaking: {e}")
 
     def enqueue(self, text):
-        if self.engine:
+        if not self.failed:
             self.queue.put(text)
 
-tts_engine = TTSEngine()
-
 def speak_async(text):
     try:
-        if game and game.tts_enabled and tts_engine.engine:
+        if game and game.tts_enabled and tts_engine is not None:
             tts_engine.enqueue(text)
     except Exception as e:
         print(f"TTS Error: {e}")
 
+# SciPy's KD-tree class, imported on first use so the simulation ticks don't repeat the import
+kd_tree_class = None
+
+def kd_tree(points):
+    global kd_tree_class
+    if kd_tree_class is None:
+        from scipy.spatial import cKDTree
+        kd_tree_class = cKDTree
+    return kd_tree_class(points)
+
+def bootstrap():
+    # Creates what importing this module used to: the Ursina app (window and audio) and the
+    # text-to-speech thread. Tools, tests and worker processes import without them, and
+    # without SciPy, which the game loads here rather than mid-frame
+    global app, tts_engine
+    if app is None:
+        startup_profile.mark('imports')
+        import scipy.ndimage, scipy.spatial
+        startup_profile.mark('scipy')
+        app = Ursina()
+        app.taskMgr.add(finish_startup, 'finish-startup', sort=60)  # Runs after the frame is drawn
+        startup_profile.mark('ursina')
+    if tts_engine is None:
+        tts_engine = TTSEngine()
+        startup_profile.mark('text to speech')
+    return app
+
+def finish_startup(task):
+    startup_profile.mark('first frame')
+    if GameConfig.profile_startup:
+        print(f"First interactive frame {startup_profile.total():.0f} ms after launch")
+        print(startup_profile.report())
+    return task.done
+
 # Hardcoded Quotes
 NARRATIVE_QUOTES = [
     "You stuck your finger to a USB port and woke up in the Matrix.",
@@ -119,114 +189,1128 @@ DEATH_PHRASES = [
     "Critical damage detected!"
 ]
 
+# Loads assets on background threads so the menu comes up while they decode. Each asset
+# gets a Future; how long its load took on the worker is kept for the startup report
+class AssetLoader:
+    def __init__(self, max_workers):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='asset-loader')
+        self.futures = {}  # Name -> Future
+        self.load_times = {}  # Name -> ms spent loading, once finished
+
+    def __contains__(self, name):
+        return name in self.futures
+
+    def submit(self, name, fn, *args):
+        def timed_load():
+            start = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self.load_times[name] = (time.perf_counter() - start) * 1000
+
+        self.futures[name] = self.executor.submit(timed_load)
+        return self.futures[name]
+
+    def ready(self, name):
+        return self.futures[name].done()
+
+    def wait(self, names=None):
+        # Block until the named assets (default: all) are loaded; returns ms spent waiting
+        start = time.perf_counter()
+        wait([self.futures[name] for name in (self.futures if names is None else names)])
+        return (time.perf_counter() - start) * 1000
+
+    def report(self):
+        return ', '.join(f'{name} {ms:.1f} ms' for name, ms in sorted(self.load_times.items(), key=lambda item: -item[1]))
+
+# Sound effects loaded and decoded once, each with a fixed pool of voices: separate
+# handles sharing the decoded data, so one sound can overlap itself. Playing takes a free
+# voice, or when all are busy cuts off the one that started longest ago and reuses it
+class SoundBank:
+    def __init__(self):
+        self.voices = {}  # Name -> AudioSound per voice
+        self.started = {}  # Name -> when each voice last started
+        self.volumes = {}
+        self.pending = {}  # Name -> Future from load_async, until it is first used
+        self.plays = 0
+        self.stolen = 0  # Plays that cut off a voice still sounding
+
+    def __contains__(self, name):
+        return name in self.voices or name in self.pending
+
+    @staticmethod
+    def decode(path, voices, volume, loop):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        sounds = [application.base.loader.loadSfx(os.path.abspath(path)) for _ in range(voices)]
+        for sound in sounds:
+            sound.set_loop(loop)
+            sound.set_volume(volume)
+        return sounds
+
+    def add(self, name, sounds, volume):
+        self.voices[name] = sounds
+        self.started[name] = [-inf] * len(sounds)
+        self.volumes[name] = volume
+
+    def load(self, name, path, voices=1, volume=1.0, loop=False):
+        self.add(name, self.decode(path, voices, volume, loop), volume)
+
+    def load_async(self, loader, name, path, voices=1, volume=1.0, loop=False):
+        self.pending[name] = (loader.submit(name, self.decode, path, voices, volume, loop), path, volume)
+
+    def sounds_for(self, name):
+        # A sound still loading counts as missing; a finished load joins the bank here
+        if name in self.pending and self.pending[name][0].done():
+            future, path, volume = self.pending.pop(name)
+            try:
+                self.add(name, future.result(), volume)
+            except Exception as e:
+                print(f"Failed to load {os.path.basename(path)}: {e}")
+        return self.voices.get(name)
+
+    def collect_loaded(self):
+        for name in list(self.pending):
+            self.sounds_for(name)
+
+    def play(self, name, volume=None):
+        sounds = self.sounds_for(name)
+        if not sounds:
+            return None
+        started = self.started[name]
+        for index, sound in enumerate(sounds):
+            if sound.status() != AudioSound.PLAYING:
+                break
+        else:
+            index = started.index(min(started))
+            self.stolen += 1
+        sound = sounds[index]
+        sound.stop()
+        sound.set_volume(self.volumes[name] if volume is None else volume)
+        sound.play()
+        started[index] = time.perf_counter()
+        self.plays += 1
+        return sound
+
+    def stop(self, name):
+        for sound in self.sounds_for(name) or ():
+            sound.stop()
+
+    def playing(self, name):
+        return any(sound.status() == AudioSound.PLAYING for sound in self.sounds_for(name) or ())
+
 class GameConfig:
     sound_enabled = True
+    sound_bank = None  # SoundBank, filled by initialize_sounds
+    sound_assets = (
+        # Name, file, volume, loops
+        ('start', 'assets/start.ogg', 1.0, False),
+        ('music', 'assets/game.ogg', 0.5, True),
+        ('shoot', 'assets/shoot.ogg', 0.8, False),
+        ('step', 'assets/step.ogg', 0.5, True),
+        ('death', 'assets/death.ogg', 1.0, False),
+        ('cubedeath', 'assets/cubedeath.ogg', 1.0, False),
+        ('jump', 'assets/jump.ogg', 1.0, False),
+        ('attack', 'assets/attack.ogg', 1.0, False),
+        ('nom', 'assets/nom.ogg', 1.0, False),
+        ('armor', 'assets/armor.ogg', 1.0, False)
+    )
+    sound_voices = {'shoot': 4, 'cubedeath': 3, 'attack': 3}  # Max overlapping plays per sound
+    default_sound_voices = 2  # For sounds not in sound_voices; looping sounds get one
+    asset_workers = 4  # Threads loading assets in the background at startup
+    first_frame_assets = ('start', 'music')  # Waited for when the game starts; the rest arrive in play
+    profile_startup = False  # Print startup phase timings after the first frame
     text_to_speech_enabled = True  # Enabled by default
     quote_interval = 20
     pickup_interval = 15
     pickup_timer = 0
+    pickup_collect_distance = 1.5  # Player centre to pickup centre
+    pickup_despawn_distance = 60  # Pickups further than this from the player are removed
+    max_pickups = 24  # Oldest pickups expire beyond this
     gravity = -20  # Gravity constant
     jump_force = 15  # Increased jump force for higher jumps
+    tick_rate = 60  # Simulation ticks per second, independent of frame rate
+    max_ticks_per_frame = 5  # Slower frames drop simulation time instead of falling further behind
+    spawn_position = (32, 5, 32)
+    chunk_size = 16  # Terrain cells per chunk side
+    enemy_despawn_distance = 50  # Enemies further than this from the player are removed
+    los_rays_per_frame = 24  # Enemy line-of-sight raycasts allowed per frame
+    los_validity = 0.5  # Seconds an enemy's line-of-sight result is reused
+    los_refresh_distance = 2.0  # Recheck sooner once the enemy or player moved this far
+    # Enemy AI level of detail. Near enemies the terrain doesn't hide think every tick, mid
+    # range ones every ai_mid_interval seconds; far or hidden ones only fall and drift
+    ai_near_distance = 12
+    ai_mid_distance = 25
+    ai_mid_interval = 0.1
+    ai_tier_interval = 0.25  # Seconds between tier reassignments
+    bullet_pool_size = 96  # Bullets (with trails) created up front; enough for sustained fire
+    particle_capacity = 2048  # Live particles for hit, death and pickup effects; bursts beyond it are dropped
+    chunk_workers = 2  # Background threads building chunk arrays
+    chunk_uploads_per_frame = 2  # Max finished chunks attached to the scene per frame
+    chunk_upload_budget_ms = 4.0  # Stop attaching chunks once a frame has spent this long on it
+    chunk_geometry_cache_size = 512  # Built chunk meshes kept for reuse
+    streamed_terrain = True  # Non-repeating terrain; False tiles one 64x64 field forever
+    world_path = None  # Directory of a precomputed world to play instead (see MappedThinkingField)
+    terrain_seed = None  # Fixed terrain seed; None gives new terrain every launch
+    chunk_packs = True  # Keep built chunks on disk for reproducible terrain (fixed seed or world)
+    chunk_pack_directory = 'chunk_packs'
+    terrain_tile_cache_megabytes = 16  # Memory cap for generated terrain tiles
+    terrain_lod = True  # Build distant chunks with fewer vertices
+    lod_ring_limits = (2, 4, 7)  # Chunk rings beyond each limit halve the vertex density again
+    lod_render_distance = 10  # Render distance used when terrain_lod is on
+    # Terrain height bands: a height below terrain_band_limits[i] (and above the previous
+    # limit) gets terrain_band_colors[i]; heights above the last limit are snow
+    terrain_band_limits = (1, 3, 7, 10)
+    terrain_band_colors = (
+        color.rgb(0.6, 0.3, 0.2),  # Brown for low areas
+        color.rgb(0.9, 0.8, 0.5),  # Sand
+        color.rgb(0.2, 0.8, 0.2),  # Grass
+        color.rgb(0.5, 0.5, 0.5),  # Mountain
+        color.rgb(1, 1, 1)  # Snow
+    )
 
     @classmethod
     def initialize_sounds(cls, game):
-        game.background_music = None
-        game.shoot_sound = None
-        game.footstep_sound = None
-        game.death_sound = None
-        game.cube_death_sound = None
-        game.start_sound = None
-        game.jump_sound = None
-        game.attack_sound = None
-
-        if cls.sound_enabled:
-            try:
-                # Check if assets directory exists
-                if not os.path.exists('assets'):
-                    os.makedirs('assets')
-                    print("Created assets directory. Please add sound files.")
-                    return
-
-                # Load all required sound files with error handling
-                game.start_sound = Audio('assets/start.ogg', loop=False, autoplay=False, volume=1.0)
-            except Exception as e:
-                print(f"Failed to load start.ogg: {e}")
-
-            try:
-                game.background_music = Audio('assets/game.ogg', loop=True, autoplay=False, volume=0.5)
-            except Exception as e:
-                print(f"Failed to load game.ogg: {e}")
-
-            try:
-                game.shoot_sound = Audio('assets/shoot.ogg', loop=False, autoplay=False, volume=0.8)
-            except Exception as e:
-                print(f"Failed to load shoot.ogg: {e}")
-
-            try:
-                game.footstep_sound = Audio('assets/step.ogg', loop=True, autoplay=False, volume=0.5)
-            except Exception as e:
-                print(f"Failed to load step.ogg: {e}")
-
-            try:
-                game.death_sound = Audio('assets/death.ogg', loop=False, autoplay=False, volume=1.0)
-            except Exception as e:
-                print(f"Failed to load death.ogg: {e}")
-
-            try:
-                game.cube_death_sound = Audio('assets/cubedeath.ogg', loop=False, autoplay=False, volume=1.0)
-            except Exception as e:
-                print(f"Failed to load cubedeath.ogg: {e}")
-
-            try:
-                game.jump_sound = Audio('assets/jump.ogg', loop=False, autoplay=False, volume=1.0)
-            except Exception as e:
-                print(f"Failed to load jump.ogg: {e}")
+        # Sounds load on game.assets; start_game waits for them
+        cls.sound_bank = SoundBank()
+        game.sounds = cls.sound_bank
+
+        # Check if assets directory exists
+        if not os.path.exists('assets'):
+            os.makedirs('assets')
+            print("Created assets directory. Please add sound files.")
+            return
 
-            try:
-                game.attack_sound = Audio('assets/attack.ogg', loop=False, autoplay=False, volume=1.0)
-            except Exception as e:
-                print(f"Failed to load attack.ogg: {e}")
+        for name, path, volume, loop in cls.sound_assets:
+            voices = 1 if loop else cls.sound_voices.get(name, cls.default_sound_voices)
+            cls.sound_bank.load_async(game.assets, name, path, voices, volume, loop)
 
     @classmethod
-    def play_sound(cls, sound, volume=1.0):
-        if cls.sound_enabled and sound:
+    def play_sound(cls, name, volume=None):
+        if cls.sound_enabled and cls.sound_bank is not None:
             try:
-                sound.volume = volume
-                sound.play()
+                cls.sound_bank.play(name, volume)
             except Exception as e:
                 logging.error(f"Failed to play sound: {e}")
 
     @classmethod
-    def stop_sound(cls, sound):
-        if sound:
+    def stop_sound(cls, name):
+        if cls.sound_bank is not None:
             try:
-                sound.stop()
+                cls.sound_bank.stop(name)
             except Exception as e:
                 logging.error(f"Failed to stop sound: {e}")
 
+    @classmethod
+    def sound_playing(cls, name):
+        return cls.sound_bank is not None and cls.sound_bank.playing(name)
+
 class ThinkingField:
-    def __init__(self, size=(64, 64), correlation_length=3.0, amplitude=10.0):
+    def __init__(self, size=(64, 64), correlation_length=3.0, amplitude=10.0, seed=None):
         self.size = size
+        self.wrap_size = size  # Heights repeat every wrap_size cells
         self.correlation_length = correlation_length
         self.amplitude = amplitude
+        self.seed = seed
+        self.set_bands(GameConfig.terrain_band_limits, GameConfig.terrain_band_colors)
         self.field = self.initialize_field()
 
+        # Per-cell band raster aligned with field, computed once
+        self.band_raster = self.bands_for(self.field)
+
     def initialize_field(self):
-        field = np.random.randn(*self.size)
+        if self.seed is None:
+            field = np.random.randn(*self.size)
+        else:
+            field = np.random.default_rng(self.seed).standard_normal(self.size)
         return self.apply_spatial_correlation(field)
 
+    def signature(self):
+        # Everything the heights depend on; chunk packs are keyed by it
+        return ('wrapping', self.size, self.correlation_length, self.amplitude, self.seed)
+
     def apply_spatial_correlation(self, field):
+        from scipy.ndimage import gaussian_filter
         smoothed_field = gaussian_filter(field, sigma=self.correlation_length)
         smoothed_field *= self.amplitude / (smoothed_field.std() + 1e-7)
         return smoothed_field
 
+    def set_bands(self, limits, colors):
+        self.band_limits = np.asarray(limits, dtype=np.float64)
+        self.band_palette = np.array([tuple(c) for c in colors], dtype=np.float32)
+        self.snow_band = len(limits)
+
+    def bands_for(self, heights):
+        return np.searchsorted(self.band_limits, heights, side='right').astype(np.uint8)
+
+    def colors_for(self, heights):
+        # RGBA rows from the band palette, for any array of heights
+        return self.band_palette[self.bands_for(heights)]
+
+    def sample(self, i, j):
+        # Heights at integer cells, wrapping around the field
+        return self.field[np.mod(i, self.size[0]), np.mod(j, self.size[1])]
+
+    def sample_bands(self, i, j):
+        return self.band_raster[np.mod(i, self.size[0]), np.mod(j, self.size[1])]
+
+    def is_snow(self, x, z):
+        # Works for single points and arrays of them
+        cells_x = np.floor(x).astype(np.int64)
+        cells_z = np.floor(z).astype(np.int64)
+        return self.sample_bands(cells_x, cells_z) == self.snow_band
+
     def get_height(self, x, z):
-        try:
-            x = int(x) % self.size[0]
-            z = int(z) % self.size[1]
-            return self.field[x, z]
-        except:
-            return 0
+        return float(self.get_heights(x, z))
+
+    def get_heights(self, xs, zs):
+        return self.get_heights_and_gradients(xs, zs, gradients=False)
+
+    def get_heights_and_gradients(self, xs, zs, gradients=True):
+        # Bilinear interpolation between the four surrounding cells. Returns heights, or
+        # (heights, dh/dx, dh/dz) when gradients is set
+        xs = np.asarray(xs, dtype=np.float64)
+        zs = np.asarray(zs, dtype=np.float64)
+        x0 = np.floor(xs)
+        z0 = np.floor(zs)
+        u = xs - x0
+        v = zs - z0
+        i = x0.astype(np.int64)
+        j = z0.astype(np.int64)
+
+        h00 = self.sample(i, j)
+        h10 = self.sample(i + 1, j)
+        h01 = self.sample(i, j + 1)
+        h11 = self.sample(i + 1, j + 1)
+
+        heights = (h00 * (1 - u) + h10 * u) * (1 - v) + (h01 * (1 - u) + h11 * u) * v
+        if not gradients:
+            return heights
+        dh_dx = (h10 - h00) * (1 - v) + (h11 - h01) * v
+        dh_dz = (h01 - h00) * (1 - u) + (h11 - h10) * u
+        return heights, dh_dx, dh_dz
+
+    def get_window(self, x0, z0, width, depth):
+        # Wrapped (width, depth) slice of the field starting at integer cell (x0, z0)
+        return self.sample(*np.ix_(np.arange(x0, x0 + width), np.arange(z0, z0 + depth)))
+
+# Non-repeating field generated in tiles on demand. Each tile's noise comes from a seed
+# derived from the tile coordinate, and tiles are smoothed together with a halo of their
+# neighbours' noise, so any cell gets the same height whichever tile computes it
+class StreamedThinkingField(ThinkingField):
+    def __init__(self, tile_size=64, correlation_length=3.0, amplitude=10.0, seed=None, cache_megabytes=16):
+        self.size = (tile_size, tile_size)
+        self.wrap_size = None
+        self.tile_size = tile_size
+        self.correlation_length = correlation_length
+        self.amplitude = amplitude
+        self.set_bands(GameConfig.terrain_band_limits, GameConfig.terrain_band_colors)
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.halo = int(4.0 * correlation_length + 0.5)  # gaussian_filter's default truncate radius
+        if self.halo > tile_size:
+            raise ValueError('correlation_length too large for tile_size')
+
+        # Std of the smoothed white noise, from the separable Gaussian kernel
+        offsets = np.arange(-self.halo, self.halo + 1)
+        kernel = np.exp(-0.5 * (offsets / correlation_length) ** 2)
+        kernel /= kernel.sum()
+        self.scale = amplitude / (kernel ** 2).sum()
+
+        self.max_tiles = max(9, int(cache_megabytes * 2 ** 20 // (tile_size * tile_size * 9)))
+        self.tiles = OrderedDict()
+        self.tiles_lock = threading.Lock()
+        self.tiles_generated = 0
+
+    def signature(self):
+        return ('streamed', self.tile_size, self.correlation_length, self.amplitude, self.seed)
+
+    def tile_noise(self, tile_x, tile_z):
+        rng = np.random.default_rng([self.seed, tile_x % 2 ** 32, tile_z % 2 ** 32])
+        return rng.standard_normal(self.size)
+
+    def generate_tile(self, tile_x, tile_z):
+        from scipy.ndimage import gaussian_filter
+        t, halo = self.tile_size, self.halo
+        noise = np.block([
+            [self.tile_noise(tile_x + dx, tile_z + dz) for dz in (-1, 0, 1)]
+            for dx in (-1, 0, 1)
+        ])[t - halo:2 * t + halo, t - halo:2 * t + halo]
+        smoothed = gaussian_filter(noise, sigma=self.correlation_length)
+        heights = smoothed[halo:halo + t, halo:halo + t] * self.scale
+        return heights, self.bands_for(heights)
+
+    def get_tile(self, tile_x, tile_z):
+        key = (tile_x, tile_z)
+        with self.tiles_lock:
+            tile = self.tiles.get(key)
+            if tile is not None:
+                self.tiles.move_to_end(key)
+                return tile
+
+        tile = self.generate_tile(tile_x, tile_z)
+        with self.tiles_lock:
+            self.tiles[key] = tile
+            self.tiles_generated += 1
+            while len(self.tiles) > self.max_tiles:
+                self.tiles.popitem(last=False)
+        return tile
+
+    def sample(self, i, j):
+        return self.gather(i, j, 0)
+
+    def sample_bands(self, i, j):
+        return self.gather(i, j, 1)
+
+    def gather(self, i, j, layer):
+        # Values of one tile layer (0 heights, 1 bands) at integer cells
+        i, j = np.broadcast_arrays(np.asarray(i, dtype=np.int64), np.asarray(j, dtype=np.int64))
+        tile_x, local_i = np.divmod(i, self.tile_size)
+        tile_z, local_j = np.divmod(j, self.tile_size)
+
+        if i.size and tile_x.min() == tile_x.max() and tile_z.min() == tile_z.max():
+            return self.get_tile(int(tile_x.flat[0]), int(tile_z.flat[0]))[layer][local_i, local_j]
+
+        values = np.empty(i.shape, dtype=np.float64 if layer == 0 else np.uint8)
+        for key in set(zip(tile_x.ravel().tolist(), tile_z.ravel().tolist())):
+            mask = (tile_x == key[0]) & (tile_z == key[1])
+            values[mask] = self.get_tile(*key)[layer][local_i[mask], local_j[mask]]
+        return values
+
+# A precomputed world on disk: a directory holding world.json and heights.npy. Cells are
+# int16 or float32, world height = cell * height_scale + height_offset. The array is
+# memory-mapped, so only the pages that chunk builds and height queries touch are read
+class MappedThinkingField(ThinkingField):
+    def __init__(self, path):
+        with open(os.path.join(path, 'world.json')) as f:
+            meta = json.load(f)
+        self.path = path
+        self.heights = np.load(os.path.join(path, 'heights.npy'), mmap_mode='r')
+        self.size = self.heights.shape
+        self.wrap_size = self.size
+        self.height_scale = meta.get('height_scale', 1.0)
+        self.height_offset = meta.get('height_offset', 0.0)
+        self.seed = meta.get('seed')
+        self.set_bands(GameConfig.terrain_band_limits, GameConfig.terrain_band_colors)
+
+    def signature(self):
+        heights = os.stat(os.path.join(self.path, 'heights.npy'))
+        return ('mapped', os.path.abspath(self.path), self.size, heights.st_size, heights.st_mtime_ns)
+
+    def sample(self, i, j):
+        cells = self.heights[np.mod(i, self.size[0]), np.mod(j, self.size[1])]
+        return cells * self.height_scale + self.height_offset
+
+    def sample_bands(self, i, j):
+        return self.bands_for(self.sample(i, j))
+
+    def get_window(self, x0, z0, width, depth):
+        # Windows that don't cross the world edge are a plain slice of the map
+        i0, j0 = x0 % self.size[0], z0 % self.size[1]
+        if i0 + width <= self.size[0] and j0 + depth <= self.size[1]:
+            return self.heights[i0:i0 + width, j0:j0 + depth] * self.height_scale + self.height_offset
+        return super().get_window(x0, z0, width, depth)
+
+def write_world(path, shape, fill_rows, height_scale=1.0, height_offset=0.0, dtype='int16', **meta):
+    # fill_rows(start, stop) returns world heights for rows start..stop; written in blocks
+    os.makedirs(path, exist_ok=True)
+    heights = np.lib.format.open_memmap(os.path.join(path, 'heights.npy'), mode='w+', dtype=dtype, shape=shape)
+    block = 256
+    for start in range(0, shape[0], block):
+        stop = min(start + block, shape[0])
+        cells = (fill_rows(start, stop) - height_offset) / height_scale
+        if np.issubdtype(heights.dtype, np.integer):
+            limits = np.iinfo(heights.dtype)
+            cells = np.clip(np.rint(cells), limits.min, limits.max)
+        heights[start:stop] = cells
+        print(f"Wrote rows {stop}/{shape[0]}")
+    heights.flush()
+    del heights
+
+    meta.update(size=list(shape), dtype=str(np.dtype(dtype)), height_scale=height_scale, height_offset=height_offset)
+    with open(os.path.join(path, 'world.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+def generate_world(path, size, seed=None, correlation_length=4.0, amplitude=8.0):
+    # Bake a size x size piece of the streamed terrain into a world directory
+    source = StreamedThinkingField(64, correlation_length, amplitude, seed=seed)
+    size = -(-size // source.tile_size) * source.tile_size
+
+    def fill_rows(start, stop):
+        rows = np.empty((stop - start, size))
+        for row in range(start, stop, source.tile_size):
+            for tile_z in range(size // source.tile_size):
+                heights, _ = source.get_tile(row // source.tile_size, tile_z)
+                rows[row - start:row - start + source.tile_size, tile_z * source.tile_size:(tile_z + 1) * source.tile_size] = heights
+        return rows
+
+    # int16 cells covering +-8 amplitudes
+    write_world(path, (size, size), fill_rows, height_scale=amplitude * 8 / 32767, seed=source.seed)
+
+def import_heightmap(source, path, shape=None, dtype='float32', vertical_scale=1.0):
+    # Convert a DEM (.npy, or raw cells with a given shape and dtype) into a world, centred
+    # on its mean height and scaled by vertical_scale into game units
+    if source.endswith('.npy'):
+        data = np.load(source, mmap_mode='r')
+    else:
+        if shape is None:
+            raise ValueError('Raw heightmaps need a shape')
+        data = np.memmap(source, dtype=dtype, mode='r', shape=tuple(shape))
+
+    total, low, high = 0.0, np.inf, -np.inf
+    for start in range(0, data.shape[0], 256):
+        rows = np.asarray(data[start:start + 256], dtype=np.float64)
+        total += rows.sum()
+        low, high = min(low, rows.min()), max(high, rows.max())
+    mean = total / data.size
+    extent = max(high - mean, mean - low, 1e-7) * vertical_scale
+
+    write_world(
+        path, data.shape,
+        lambda start, stop: (np.asarray(data[start:stop], dtype=np.float64) - mean) * vertical_scale,
+        height_scale=extent / 32767, source=os.path.basename(source)
+    )
+
+def create_field():
+    # The terrain the game plays on, as configured
+    if GameConfig.world_path:
+        return MappedThinkingField(GameConfig.world_path)
+    if GameConfig.streamed_terrain:
+        return StreamedThinkingField(
+            tile_size=64, correlation_length=4.0, amplitude=8.0, seed=GameConfig.terrain_seed,
+            cache_megabytes=GameConfig.terrain_tile_cache_megabytes
+        )
+    return ThinkingField(size=(64, 64), correlation_length=4.0, amplitude=8.0, seed=GameConfig.terrain_seed)
+
+def chunk_tile_key(field, chunk_x, chunk_z, chunk_size):
+    # A wrapping field repeats, so chunks a whole field apart cover the same heights
+    if field.wrap_size is None:
+        return (chunk_x, chunk_z)
+    tiles_x, rem_x = divmod(field.wrap_size[0], chunk_size)
+    tiles_z, rem_z = divmod(field.wrap_size[1], chunk_size)
+    if rem_x or rem_z:
+        return (chunk_x, chunk_z)
+    return (chunk_x % tiles_x, chunk_z % tiles_z)
+
+def chunk_variants_around(player_chunk_x, player_chunk_z, render_distance, chunk_size):
+    # LOD variant (step, -x, +x, -z, +z) of every chunk within render distance
+    offsets = np.arange(-render_distance - 1, render_distance + 2)
+    steps = np.ones((offsets.size, offsets.size), dtype=np.int64)
+    if GameConfig.terrain_lod:
+        ring = np.maximum(np.abs(offsets)[:, None], np.abs(offsets)[None, :])
+        for limit in GameConfig.lod_ring_limits:
+            steps = np.where((ring > limit) & (steps < chunk_size), steps * 2, steps)
+
+    step = steps[1:-1, 1:-1]
+    columns = (
+        step,
+        np.maximum(step, steps[:-2, 1:-1]),
+        np.maximum(step, steps[2:, 1:-1]),
+        np.maximum(step, steps[1:-1, :-2]),
+        np.maximum(step, steps[1:-1, 2:])
+    )
+    chunk_x, chunk_z = np.meshgrid(offsets[1:-1] + player_chunk_x, offsets[1:-1] + player_chunk_z, indexing='ij')
+    return dict(zip(
+        zip(chunk_x.ravel().tolist(), chunk_z.ravel().tolist()),
+        zip(*(column.ravel().tolist() for column in columns))
+    ))
+
+def build_chunk_arrays(field, chunk_x, chunk_z, chunk_size, variant=(1, 1, 1, 1, 1)):
+    # Shared-vertex grid with a vertex every `step` cells, vertex index = x * n + z.
+    # variant is (step, -x, +x, -z, +z), the edge steps being those of coarser neighbours
+    step = variant[0]
+    full = field.get_window(chunk_x * chunk_size, chunk_z * chunk_size, chunk_size + 1, chunk_size + 1)
+    heights = full[::step, ::step].copy()
+    n = heights.shape[0]
+
+    # Pull edge vertices onto the coarser neighbour's edge so the seams don't crack
+    for edge, edge_step in zip((heights[0, :], heights[-1, :], heights[:, 0], heights[:, -1]), variant[1:]):
+        ratio = edge_step // step
+        if ratio > 1:
+            edge[:] = np.interp(np.arange(n), np.arange(0, n, ratio), edge[::ratio])
+
+    gx, gz = np.meshgrid(np.arange(n), np.arange(n), indexing='ij')
+    vertices = np.stack((gx * step, heights, gz * step), axis=-1).reshape(-1, 3).astype(np.float32)
+    uvs = (np.stack((gx, gz), axis=-1).reshape(-1, 2) * step / chunk_size).astype(np.float32)
+    colors = field.colors_for(heights.ravel())
+
+    # Two triangles per cell, same winding as the per-quad layout
+    v00 = (gx[:-1, :-1] * n + gz[:-1, :-1]).ravel()
+    v10 = v00 + n
+    v01 = v00 + 1
+    v11 = v00 + n + 1
+    triangles = np.stack((v00, v10, v01, v10, v11, v01), axis=-1).reshape(-1).astype(np.int32)
+
+    return vertices, triangles, colors, uvs
+
+# Runs chunk array builds off the main thread, keyed by chunk coordinate
+class ChunkWorkerPool:
+    def __init__(self, max_workers):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='chunk-worker')
+        self.pending = {}
+
+    def __contains__(self, key):
+        return key in self.pending
+
+    def submit(self, key, fn, *args):
+        if key not in self.pending:
+            self.pending[key] = self.executor.submit(fn, *args)
+
+    def cancel(self, key):
+        future = self.pending.pop(key, None)
+        if future:
+            future.cancel()  # Already running builds finish but their result is dropped
+
+    def pop_finished(self):
+        finished = {}
+        for key, future in list(self.pending.items()):
+            if future.done():
+                del self.pending[key]
+                try:
+                    finished[key] = future.result()
+                except Exception as e:
+                    logging.error(f"Chunk {key} failed to build: {e}")
+        return finished
+
+# Chunk vertex data in three float32 arrays (positions, colours, UVs), laid out like the
+# arrays from build_chunk_arrays so they can be copied in as whole buffers
+def make_chunk_vertex_format():
+    vertex_format = GeomVertexFormat()
+    for name, components, contents in (
+        (InternalName.get_vertex(), 3, Geom.C_point),
+        (InternalName.get_color(), 4, Geom.C_color),
+        (InternalName.get_texcoord(), 2, Geom.C_texcoord)
+    ):
+        array_format = GeomVertexArrayFormat()
+        array_format.add_column(name, components, Geom.NT_float32, contents)
+        vertex_format.add_array(array_format)
+    return GeomVertexFormat.register_format(vertex_format)
+
+CHUNK_VERTEX_FORMAT = make_chunk_vertex_format()
+
+def chunk_node_from_arrays(arrays, name='chunk'):
+    vertices, triangles, colors, uvs = arrays
+    vertex_data = GeomVertexData(name, CHUNK_VERTEX_FORMAT, Geom.UH_static)
+    vertex_data.unclean_set_num_rows(len(vertices))
+    for index, array in enumerate((vertices, colors, uvs)):
+        vertex_data.modify_array_handle(index).copy_data_from(np.ascontiguousarray(array, dtype=np.float32))
+    primitive = GeomTriangles(Geom.UH_static)
+    primitive.set_index_type(Geom.NT_uint32)
+    primitive.modify_vertices().modify_handle().copy_data_from(np.ascontiguousarray(triangles, dtype=np.uint32))
+    geom = Geom(vertex_data)
+    geom.add_primitive(primitive)
+    node = GeomNode(name)
+    node.add_geom(geom)
+    return NodePath(node)
+
+# Built chunk arrays on disk, so warm starts and revisits skip build_chunk_arrays. There is
+# one pack directory per field signature: data.bin holds each chunk's arrays back to back
+# (positions, colours, UVs, triangles) and index.bin one record per chunk. Reads are views
+# into a memory map of data.bin
+CHUNK_PACK_VERSION = 1
+CHUNK_PACK_RECORD = np.dtype([
+    ('tile', '<i8', 2), ('variant', '<i4', 5), ('offset', '<i8'), ('vertex_count', '<i4'), ('index_count', '<i4')
+])
+
+def chunk_pack_path(field, chunk_size):
+    signature = repr((
+        CHUNK_PACK_VERSION, field.signature(), chunk_size,
+        field.band_limits.tolist(), field.band_palette.tolist()
+    ))
+    digest = hashlib.sha1(signature.encode()).hexdigest()[:16]
+    return os.path.join(GameConfig.chunk_pack_directory, digest)
+
+class ChunkMeshPack:
+    def __init__(self, path):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        data_path = os.path.join(path, 'data.bin')
+        index_path = os.path.join(path, 'index.bin')
+        self.data_file = open(data_path, 'ab')
+        self.index_file = open(index_path, 'ab')
+        self.data_size = self.data_file.tell()
+        self.data = None
+
+        # Records whose data never made it to disk (an interrupted write) are skipped
+        with open(index_path, 'rb') as f:
+            index = f.read()
+        index = index[:len(index) - len(index) % CHUNK_PACK_RECORD.itemsize]
+        self.records = {}
+        for record in np.frombuffer(index, dtype=CHUNK_PACK_RECORD).tolist():
+            tile, variant, offset, vertex_count, index_count = record
+            if offset + (vertex_count * 9 + index_count) * 4 <= self.data_size:
+                self.records[(tuple(tile), tuple(variant))] = (offset, vertex_count, index_count)
+
+    def __contains__(self, key):
+        return key in self.records
+
+    def __len__(self):
+        return len(self.records)
+
+    def get(self, key):
+        offset, vertex_count, index_count = self.records[key]
+        end = offset + (vertex_count * 9 + index_count) * 4
+        if self.data is None or len(self.data) < end:
+            self.data = np.memmap(self.data_file.name, dtype=np.uint8, mode='r')
+        floats = self.data[offset:offset + vertex_count * 36].view(np.float32)
+        vertices = floats[:vertex_count * 3].reshape(-1, 3)
+        colors = floats[vertex_count * 3:vertex_count * 7].reshape(-1, 4)
+        uvs = floats[vertex_count * 7:].reshape(-1, 2)
+        triangles = self.data[offset + vertex_count * 36:end].view(np.int32)
+        return vertices, triangles, colors, uvs
+
+    def put(self, key, arrays):
+        if key in self.records:
+            return
+        vertices, triangles, colors, uvs = arrays
+        offset = self.data_size
+        for array, dtype in ((vertices, np.float32), (colors, np.float32), (uvs, np.float32), (triangles, np.int32)):
+            data = np.ascontiguousarray(array, dtype=dtype).tobytes()
+            self.data_file.write(data)
+            self.data_size += len(data)
+        self.data_file.flush()  # Data before index, so a record never points past the data
+
+        record = np.zeros(1, dtype=CHUNK_PACK_RECORD)
+        record['tile'], record['variant'] = key
+        record['offset'] = offset
+        record['vertex_count'] = len(vertices)
+        record['index_count'] = len(triangles)
+        self.index_file.write(record.tobytes())
+        self.index_file.flush()
+        self.records[key] = (offset, len(vertices), len(triangles))
+
+    def close(self):
+        self.data_file.close()
+        self.index_file.close()
+
+# Built chunk meshes, keyed by the part of the field they cover. Chunks that wrap onto
+# the same tile get a copy of the cached node, which shares the geometry
+class ChunkGeometryCache:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.root = NodePath('chunk_geometry_cache')  # Never attached to the scene
+        self.prototypes = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        return key in self.prototypes
+
+    def add(self, key, arrays):
+        holder = self.root.attach_new_node('chunk')
+        mesh = chunk_node_from_arrays(arrays)
+        mesh.reparent_to(holder)
+        self.prototypes[key] = (holder, mesh)
+        self.misses += 1
+        while len(self.prototypes) > self.max_entries:
+            _, (holder, _) = self.prototypes.popitem(last=False)
+            holder.remove_node()  # Chunks already placed keep their copies
+
+    def instantiate(self, key, parent, position):
+        _, mesh = self.prototypes[key]
+        self.prototypes.move_to_end(key)
+        chunk = mesh.copy_to(parent)
+        chunk.set_pos(position)
+        return chunk
+
+# Loaded chunks in a fixed (2r+1)^2 array indexed by chunk coordinate modulo its size.
+# Every chunk within render distance of the player has its own slot
+class ToroidalChunkGrid:
+    def __init__(self, radius):
+        self.radius = radius
+        self.size = 2 * radius + 1
+        self.slots = [[None] * self.size for _ in range(self.size)]  # (key, value) or None
+        self.count = 0
+
+    def _slot(self, key):
+        return self.slots[key[0] % self.size], key[1] % self.size
+
+    def get(self, key, default=None):
+        row, index = self._slot(key)
+        entry = row[index]
+        return entry[1] if entry and entry[0] == key else default
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __setitem__(self, key, value):
+        row, index = self._slot(key)
+        if row[index] is None:
+            self.count += 1
+        elif row[index][0] != key:
+            raise KeyError(f'slot for chunk {key} is still held by {row[index][0]}')
+        row[index] = (key, value)
+
+    def pop(self, key, default=None):
+        row, index = self._slot(key)
+        entry = row[index]
+        if not entry or entry[0] != key:
+            return default
+        row[index] = None
+        self.count -= 1
+        return entry[1]
+
+    def items(self):
+        return [entry for row in self.slots for entry in row if entry]
+
+    def values(self):
+        return [value for _, value in self.items()]
+
+    def __len__(self):
+        return self.count
+
+# Terrain collision answered directly from the field, over the same two triangles per
+# cell that build_chunk_arrays renders, so chunks need no collision meshes
+class HeightfieldCollider:
+    def __init__(self, field):
+        self.field = field
+
+    def surface_heights(self, xs, zs):
+        # Mesh surface height at many points at once
+        i = np.floor(xs).astype(np.int64)
+        j = np.floor(zs).astype(np.int64)
+        if i.size == 0:
+            return np.zeros(i.shape)
+        u = xs - i
+        v = zs - j
+        i_min, j_min = i.min(), j.min()
+        width, depth = i.max() - i_min + 2, j.max() - j_min + 2
+        if width * depth <= max(4 * i.size, 4096):
+            # Points close together: one window read, then plain indexing
+            window = self.field.get_window(i_min, j_min, width, depth)
+            i, j = i - i_min, j - j_min
+            h00, h10, h01, h11 = window[i, j], window[i + 1, j], window[i, j + 1], window[i + 1, j + 1]
+        else:
+            h00 = self.field.sample(i, j)
+            h10 = self.field.sample(i + 1, j)
+            h01 = self.field.sample(i, j + 1)
+            h11 = self.field.sample(i + 1, j + 1)
+        return np.where(
+            u + v <= 1,
+            h00 + (h10 - h00) * u + (h01 - h00) * v,
+            h11 + (h01 - h11) * (1 - u) + (h10 - h11) * (1 - v)
+        )
+
+    def segments_hit(self, origins, targets):
+        # Terrain occlusion for N segments in one pass. Returns a hit flag per segment and
+        # the distance to the first hit (the segment length where there is none).
+        # Each segment is cut where it crosses a cell edge (x or z integer) or a cell
+        # diagonal (x + z integer); between cuts it stays on one triangle, so checking
+        # the clearance at every cut finds the first crossing exactly
+        origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+        deltas = np.asarray(targets, dtype=np.float64).reshape(-1, 3) - origins
+        lengths = np.linalg.norm(deltas, axis=1)
+        if len(origins) == 0:
+            return np.zeros(0, dtype=bool), lengths
+
+        cuts = [np.zeros((len(origins), 1)), np.ones((len(origins), 1))]
+        for start, change in (
+            (origins[:, 0], deltas[:, 0]),
+            (origins[:, 2], deltas[:, 2]),
+            (origins[:, 0] + origins[:, 2], deltas[:, 0] + deltas[:, 2])
+        ):
+            end = start + change
+            first = np.floor(np.minimum(start, end)) + 1
+            counts = np.maximum(np.ceil(np.maximum(start, end)) - first, 0).astype(np.int64)
+            k = np.arange(counts.max(initial=0))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                fractions = (first[:, None] + k - start[:, None]) / change[:, None]
+            cuts.append(np.where(k < counts[:, None], fractions, 1.0))
+        s = np.sort(np.concatenate(cuts, axis=1), axis=1)
+
+        points = origins[:, None, :] + s[:, :, None] * deltas[:, None, :]
+        clearance = points[:, :, 1] - self.surface_heights(points[:, :, 0], points[:, :, 2])
+        below = clearance <= 0
+        hits = below.any(axis=1)
+
+        # Linear root between the last cut above the surface and the first one below
+        rows = np.arange(len(origins))
+        first_below = below.argmax(axis=1)
+        before = np.maximum(first_below - 1, 0)
+        c0, c1 = clearance[rows, before], clearance[rows, first_below]
+        s0, s1 = s[rows, before], s[rows, first_below]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            s_hit = np.where(first_below == 0, 0.0, s0 + (s1 - s0) * c0 / (c0 - c1))
+        return hits, np.where(hits, s_hit * lengths, lengths)
+
+# Uniform grid over the x/z plane for radius queries. Objects are re-bucketed only when
+# they move into another cell
+class SpatialHashGrid:
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}  # cell -> set of items
+        self.positions = {}  # item -> (x, z, cell)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, item):
+        return item in self.positions
+
+    def cell_of(self, x, z):
+        return (math.floor(x / self.cell_size), math.floor(z / self.cell_size))
+
+    def insert(self, item, x, z):
+        self.update(item, x, z)
+
+    def update(self, item, x, z):
+        cell = self.cell_of(x, z)
+        old = self.positions.get(item)
+        if old is not None and old[2] != cell:
+            self._discard(item, old[2])
+        if old is None or old[2] != cell:
+            self.cells.setdefault(cell, set()).add(item)
+        self.positions[item] = (x, z, cell)
+
+    def remove(self, item):
+        old = self.positions.pop(item, None)
+        if old is not None:
+            self._discard(item, old[2])
+
+    def _discard(self, item, cell):
+        bucket = self.cells[cell]
+        bucket.discard(item)
+        if not bucket:
+            del self.cells[cell]
+
+    def query(self, x, z, radius):
+        # Items within radius of (x, z) on the x/z plane
+        min_x, min_z = self.cell_of(x - radius, z - radius)
+        max_x, max_z = self.cell_of(x + radius, z + radius)
+        if (max_x - min_x + 1) * (max_z - min_z + 1) <= len(self.cells):
+            buckets = (
+                self.cells.get((cell_x, cell_z), ())
+                for cell_x in range(min_x, max_x + 1) for cell_z in range(min_z, max_z + 1)
+            )
+        else:
+            # Large radius: walking the occupied cells is cheaper than the covered ones
+            buckets = (
+                bucket for (cell_x, cell_z), bucket in self.cells.items()
+                if min_x <= cell_x <= max_x and min_z <= cell_z <= max_z
+            )
+        radius_sq = radius * radius
+        found = []
+        for bucket in buckets:
+            for item in bucket:
+                item_x, item_z, _ = self.positions[item]
+                if (item_x - x) ** 2 + (item_z - z) ** 2 <= radius_sq:
+                    found.append(item)
+        return found
+
+# Runs the simulation in fixed-length ticks, independent of frame rate. Each frame adds its
+# dt to an accumulator and runs as many whole ticks as fit; systems run in registration
+# order, once per tick. Tracked entities are drawn between their last two simulated
+# positions, so motion stays smooth when frames and ticks don't line up
+class SimulationScheduler:
+    def __init__(self, tick_rate, max_ticks_per_frame):
+        self.tick_dt = 1 / tick_rate
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.systems = []  # (name, function taking dt)
+        self.accumulator = 0.0
+        self.alpha = 0.0  # How far the frame is from the last tick towards the next one
+        self.ticks = 0
+        self.timings = {}  # System name -> ms spent in the last tick
+        self.average_timings = {}  # System name -> smoothed ms per tick
+        self.interpolated = {}  # Entity -> (position before the last tick, simulated position)
+
+    def register(self, name, system):
+        self.systems.append((name, system))
+
+    def track(self, entity):
+        # Also used to teleport a tracked entity: call it after setting the position
+        self.interpolated[entity] = (entity.position, entity.position)
+
+    def advance(self, frame_dt):
+        # Put tracked entities back where the simulation left them
+        for entity, (_, simulated) in self.interpolated.items():
+            entity.position = simulated
+
+        self.accumulator += frame_dt
+        ticks = 0
+        while self.accumulator >= self.tick_dt:
+            if ticks == self.max_ticks_per_frame:
+                self.accumulator %= self.tick_dt
+                break
+            for entity in list(self.interpolated):
+                self.interpolated[entity] = (entity.position, None)
+            self.tick()
+            self.accumulator -= self.tick_dt
+            ticks += 1
+
+        self.alpha = self.accumulator / self.tick_dt
+        for entity, (previous, _) in list(self.interpolated.items()):
+            simulated = entity.position
+            self.interpolated[entity] = (previous, simulated)
+            entity.position = lerp(previous, simulated, self.alpha)
+        return ticks
+
+    def tick(self):
+        for name, system in self.systems:
+            start = time.perf_counter()
+            system(self.tick_dt)
+            elapsed = (time.perf_counter() - start) * 1000
+            self.timings[name] = elapsed
+            self.average_timings[name] = self.average_timings.get(name, elapsed) * 0.95 + elapsed * 0.05
+        self.ticks += 1
+
+class EntityPool:
+    # Entities are created up front and disabled while free, so shooting never
+    # builds or destroys scene nodes. An empty pool still hands out a new entity
+    # and counts it as a miss; the entity then stays in the pool.
+    def __init__(self, factory, size):
+        self.factory = factory
+        self.free = []
+        self.size = 0
+        self.in_use = 0
+        self.high_water = 0  # Most entities in use at once
+        self.misses = 0  # Acquires that had to create an entity
+        for _ in range(size):
+            self.free.append(self.create())
+
+    def create(self):
+        entity = self.factory()
+        entity.enabled = False
+        self.size += 1
+        return entity
+
+    def acquire(self):
+        if self.free:
+            entity = self.free.pop()
+        else:
+            entity = self.create()
+            self.misses += 1
+        entity.enabled = True
+        self.in_use += 1
+        self.high_water = max(self.high_water, self.in_use)
+        return entity
+
+    def release(self, entity):
+        entity.enabled = False
+        self.in_use -= 1
+        self.free.append(entity)
+
+    def stats(self):
+        return {'size': self.size, 'in_use': self.in_use, 'high_water': self.high_water, 'misses': self.misses}
+
+# Entity state in NumPy columns, one row per entity, for systems that step many entities
+# as a batch. Subclasses list their columns as (name, shape of a row, dtype); each entity
+# keeps its row number in the attribute named by index_name. Storage doubles when full,
+# and removing an entity moves the last row into its place
+class EntityRows:
+    columns = ()
+    index_name = 'row_index'
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entities = []  # Entity for each row
+        self.count = 0
+        for name, shape, dtype in self.columns:
+            setattr(self, name, np.zeros((capacity,) + shape, dtype=dtype))
+
+    def __len__(self):
+        return self.count
+
+    def add_row(self, entity):
+        # Returns the new row's index; the caller fills it in
+        if self.count == self.capacity:
+            self.capacity *= 2
+            for name, _, _ in self.columns:
+                column = getattr(self, name)
+                grown = np.zeros((self.capacity,) + column.shape[1:], dtype=column.dtype)
+                grown[:self.count] = column[:self.count]
+                setattr(self, name, grown)
+        index = self.count
+        self.entities.append(entity)
+        setattr(entity, self.index_name, index)
+        self.count += 1
+        return index
+
+    def remove(self, entity):
+        index = getattr(entity, self.index_name)
+        if index is None:
+            return
+        last = self.count - 1
+        for name, _, _ in self.columns:
+            column = getattr(self, name)
+            column[index] = column[last]
+        moved = self.entities.pop()
+        if moved is not entity:
+            self.entities[index] = moved
+            setattr(moved, self.index_name, index)
+        setattr(entity, self.index_name, None)
+        self.count -= 1
+
+    def render(self, alpha):
+        # Place entities between their last two simulated positions, for stores with
+        # positions and previous_positions columns
+        previous = self.previous_positions[:self.count]
+        shown = previous + (self.positions[:self.count] - previous) * alpha
+        for entity, (x, y, z) in zip(self.entities, shown.tolist()):
+            entity.set_pos(x, y, z)
+
+# All live pickups: a spatial hash finds the few near the player, and NumPy rows of
+# position, bounding box, heading and age let spinning and expiry run as batches.
+# Removing a pickup moves the last row into its place
+class PickupManager(EntityRows):
+    spin_speed = 100  # Degrees per second
+    index_name = 'pickup_index'
+    columns = (
+        ('positions', (3,), float),
+        ('half_extents', (3,), float),  # Box covering every heading
+        ('headings', (), float),
+        ('ages', (), float)
+    )
+
+    def __init__(self, cell_size=8, capacity=32):
+        super().__init__(capacity)
+        self.grid = SpatialHashGrid(cell_size)
+        self.expired = 0
+
+    def add(self, entity):
+        index = self.add_row(entity)
+        x, y, z = entity.world_position
+        scale_x, scale_y, scale_z = entity.world_scale
+        across = math.hypot(scale_x, scale_z) / 2
+        self.positions[index] = (x, y, z)
+        self.half_extents[index] = (across, scale_y / 2, across)
+        self.headings[index] = entity.rotation_y
+        self.ages[index] = 0
+        self.grid.insert(entity, x, z)
+
+    def remove(self, entity):
+        if entity.pickup_index is not None:
+            self.grid.remove(entity)
+        super().remove(entity)
+
+    def tick(self, dt, player):
+        n = self.count
+        self.ages[:n] += dt
+        self.headings[:n] = (self.headings[:n] + self.spin_speed * dt) % 360
+
+        # Ursina's rotation_y is heading times the first rotation direction
+        direction = Entity.rotation_directions[0]
+        for entity, heading in zip(self.entities, self.headings[:n].tolist()):
+            entity.set_h(heading * direction)
+
+        # Collect the pickups touching the player
+        px, py, pz = player.position
+        reach_sq = GameConfig.pickup_collect_distance ** 2
+        for entity in self.grid.query(px, pz, GameConfig.pickup_collect_distance):
+            x, y, z = self.positions[entity.pickup_index]
+            if (x - px) ** 2 + (y - py) ** 2 + (z - pz) ** 2 <= reach_sq:
+                entity.collect()
+
+        # Expire pickups left far behind, then the oldest beyond the cap
+        n = self.count
+        offsets = self.positions[:n] - (px, py, pz)
+        far = np.einsum('ij,ij->i', offsets, offsets) > GameConfig.pickup_despawn_distance ** 2
+        expiring = set(np.flatnonzero(far).tolist())
+        excess = n - len(expiring) - GameConfig.max_pickups
+        if excess > 0:
+            oldest = np.argsort(-self.ages[:n], kind='stable')
+            expiring.update([i for i in oldest.tolist() if i not in expiring][:excess])
+        for entity in [self.entities[i] for i in expiring]:
+            self.expired += 1
+            game.despawn_pickup(entity)
 
 class HealthPill(Entity):
     def __init__(self, position):
@@ -239,19 +1323,17 @@ class HealthPill(Entity):
         )
         self.rotation_y = random.randint(0, 360)
         self.heal_amount = 50
-
-    def update(self):
-        self.rotation_y += 100 * time.dt
-        if self.intersects(game.player).hit:
-            GameConfig.play_sound(Audio('assets/nom.ogg', autoplay=False), volume=1.0)
-            game.player.heal(self.heal_amount)
-            destroy(self)
+        game.pickup_manager.add(self)
 
     def take_damage(self, amount):
         if amount >= 1:
-            GameConfig.play_sound(Audio('assets/nom.ogg', autoplay=False), volume=1.0)
-            game.player.heal(self.heal_amount)
-            destroy(self)
+            self.collect()
+
+    def collect(self):
+        GameConfig.play_sound('nom')
+        game.player.heal(self.heal_amount)
+        game.particles.burst('pickup', self.world_position, self.color)
+        game.despawn_pickup(self)
 
 class ArmorPickup(Entity):
     def __init__(self, position):
@@ -264,19 +1346,17 @@ class ArmorPickup(Entity):
         )
         self.rotation_y = random.randint(0, 360)
         self.armor_amount = 50
-
-    def update(self):
-        self.rotation_y += 100 * time.dt
-        if self.intersects(game.player).hit:
-            GameConfig.play_sound(Audio('assets/armor.ogg', autoplay=False), volume=1.0)
-            game.player.add_armor(self.armor_amount)
-            destroy(self)
+        game.pickup_manager.add(self)
 
     def take_damage(self, amount):
         if amount >= 1:
-            GameConfig.play_sound(Audio('assets/armor.ogg', autoplay=False), volume=1.0)
-            game.player.add_armor(self.armor_amount)
-            destroy(self)
+            self.collect()
+
+    def collect(self):
+        GameConfig.play_sound('armor')
+        game.player.add_armor(self.armor_amount)
+        game.particles.burst('pickup', self.world_position, self.color)
+        game.despawn_pickup(self)
 
 class Enemy(Entity):
     def __init__(self, position):
@@ -295,34 +1375,33 @@ class Enemy(Entity):
             collider='box'
         )
         self.original_color = color_choice  # Store original color for color transitions
-        self.health = 100
-        self.speed = 6  # Increased speed
-        self.search_radius = 25  # Slightly increased search radius
-        self.attack_range = 5
-        self.attack_cooldown = 1.5  # Reduced cooldown
-        self.attack_timer = 0
         base_damage = 15  # Increased base damage
-        self.damage = base_damage * (size / 1.5)  # Scale damage based on size
-        
-        # Physics properties
-        self.velocity = Vec3(0, 0, 0)
-        self.acceleration = Vec3(0, -20, 0)  # Gravity
-        self.is_grounded = False
+
+        # Health, physics and AI state live in the swarm's arrays
+        self.swarm_index = None
+        game.enemy_swarm.add(
+            self, position,
+            damage=base_damage * (size / 1.5),  # Scale damage based on size
+            extents=self.scale
+        )
 
     def take_damage(self, amount):
-        self.health -= amount
-        if self.health <= 0:
+        if self.swarm_index is None:
+            return  # Already dead
+        swarm = game.enemy_swarm
+        swarm.health[self.swarm_index] -= amount
+        health = swarm.health[self.swarm_index]
+        if health <= 0:
             self.die()
             return
-        health_ratio = self.health / 100
+        health_ratio = health / swarm.max_health
         # Darken color as health decreases
         self.color = lerp(color.white, self.original_color, health_ratio)
 
     def die(self):
         speak_async(random.choice(ENEMY_DEATH_PHRASES))
-        if game.cube_death_sound:
-            GameConfig.play_sound(game.cube_death_sound)
-            
+        GameConfig.play_sound('cubedeath')
+
         if random.random() < 0.3:
             if random.random() < 0.7:
                 HealthPill(position=self.position)
@@ -330,96 +1409,381 @@ class Enemy(Entity):
                 ArmorPickup(position=self.position)
         if game:
             game.score += 50
+        game.particles.burst('death', self.position, self.original_color, scale=self.scale_x / 2)
+        game.enemy_swarm.remove(self)
         destroy(self)
-        if self in game.enemies:
-            game.enemies.remove(self)
 
     def attack(self):
         if hasattr(game.player, 'take_damage'):
-            game.player.take_damage(self.damage)
-            if game.attack_sound:
-                GameConfig.play_sound(game.attack_sound)
-
-    def update(self):
-        if not game.player or game.game_over or game.game_paused:
-            return
-
-        # Apply physics
-        if not self.is_grounded:
-            self.velocity += self.acceleration * time.dt
-            self.y += self.velocity.y * time.dt
-
-        # Ground check and get terrain color
-        ground_height = game.field.get_height(self.x, self.z) + 1
-        terrain_color = game.get_color_from_height(ground_height - 1)
-        
-        # Set grounded state
-        if self.y <= ground_height:
-            self.y = ground_height
-            self.velocity.y = 0
-            self.is_grounded = True
-        else:
-            self.is_grounded = False
-
-        # Don't proceed if on snow (white terrain)
-        if terrain_color == color.rgb(1, 1, 1):
+            game.player.take_damage(game.enemy_swarm.damage[self.swarm_index])
+            GameConfig.play_sound('attack')
+
+# Enemy state in NumPy arrays, one row per enemy, stepped once per frame in vectorized
+# passes. Enemy entities only mirror their row's position for rendering and collision.
+# Removing an enemy moves the last row into its place
+class EnemySwarm(EntityRows):
+    max_health = 100
+    speed = 6  # Increased speed
+    search_radius = 25  # Slightly increased search radius
+    attack_range = 5
+    attack_cooldown = 1.5  # Reduced cooldown
+    separation_distance = 1.5
+    tier_names = ('near', 'mid', 'far')
+    index_name = 'swarm_index'
+    columns = (
+        ('positions', (3,), float),
+        ('previous_positions', (3,), float),  # At the start of the last tick
+        ('velocities', (3,), float),
+        ('half_extents', (3,), float),  # Of each enemy's bounding box
+        ('health', (), float),
+        ('damage', (), float),
+        ('attack_timers', (), float),
+        ('grounded', (), bool),
+        # AI level of detail: tier index into tier_names, time since the enemy last thought,
+        # and whether it was chasing then (it keeps moving between thinks)
+        ('tiers', (), np.int8),
+        ('ai_dt', (), float),
+        ('moving', (), bool),
+        # Last line-of-sight result per enemy, when it was taken and from where to where
+        ('los_visible', (), bool),
+        ('los_checked_at', (), float),
+        ('los_origins', (3,), float),
+        ('los_targets', (3,), float)
+    )
+
+    def __init__(self, field, capacity=64):
+        super().__init__(capacity)
+        self.field = field
+        self.tier_timer = 0.0
+        self.tier_counts = dict.fromkeys(self.tier_names, 0)  # At the last reassignment
+        self.ai_updates = 0  # Enemies that thought in the last tick
+        self.los_cursor = 0  # Row the next round of line-of-sight refreshes starts from
+        self.time = 0.0
+
+        # Rays left this frame, shared by all the ticks the frame runs
+        self.rays_left = GameConfig.los_rays_per_frame
+
+        # Line-of-sight stats, for tuning GameConfig.los_rays_per_frame
+        self.rays_cast = 0  # This frame so far
+        self.rays_waiting = 0  # Stale results left for later frames, last tick
+        self.rays_cast_total = 0
+        self.frames = 0
+        self.ticks = 0
+
+    def add(self, entity, position, damage, extents):
+        index = self.add_row(entity)
+        self.positions[index] = tuple(position)
+        self.previous_positions[index] = self.positions[index]
+        self.velocities[index] = 0
+        self.half_extents[index] = tuple(extents)
+        self.half_extents[index] /= 2
+        self.health[index] = self.max_health
+        self.damage[index] = damage
+        self.attack_timers[index] = 0
+        self.grounded[index] = False
+        self.tiers[index] = 1  # Mid until the next reassignment
+        self.ai_dt[index] = 0
+        self.moving[index] = False
+        self.los_visible[index] = False
+        self.los_checked_at[index] = -np.inf
+
+    def distances_to(self, position):
+        return np.linalg.norm(self.positions[:self.count] - tuple(position), axis=1)
+
+    def beyond(self, position, radius):
+        return [self.entities[i] for i in np.flatnonzero(self.distances_to(position) > radius).tolist()]
+
+    def begin_frame(self):
+        self.rays_left = GameConfig.los_rays_per_frame
+        self.rays_cast = 0
+        self.frames += 1
+
+    def update_line_of_sight(self, candidates, to_player, distances, player):
+        # Terrain occlusion is checked for every candidate each tick in one heightfield
+        # pass. Entity occlusion needs a collision raycast, so each enemy's last result is
+        # reused until it expires or either end has moved too far. Stale results for
+        # enemies the terrain doesn't hide are refreshed round-robin over rows, at most
+        # los_rays_per_frame across all ticks of a frame
+        positions = self.positions[:self.count]
+        player_position = positions[candidates] + to_player[candidates]
+        terrain_blocked, _ = game.ground.segments_hit(positions[candidates], player_position)
+        clear = ~terrain_blocked
+        candidates, player_position = candidates[clear], player_position[clear]
+
+        refresh_sq = GameConfig.los_refresh_distance ** 2
+        stale = candidates[
+            (self.time - self.los_checked_at[candidates] > GameConfig.los_validity)
+            | (((positions[candidates] - self.los_origins[candidates]) ** 2).sum(axis=1) > refresh_sq)
+            | (((player_position - self.los_targets[candidates]) ** 2).sum(axis=1) > refresh_sq)
+        ]
+        split = np.searchsorted(stale, self.los_cursor)
+        refresh = np.concatenate((stale[split:], stale[:split]))[:self.rays_left]
+        if len(refresh):
+            self.los_cursor = int(refresh[-1]) + 1
+
+        directions = to_player[refresh] / distances[refresh, None]
+        for i, origin, direction, distance in zip(
+            refresh.tolist(), positions[refresh].tolist(), directions.tolist(), distances[refresh].tolist()
+        ):
+            hit_info = raycast(Vec3(*origin), Vec3(*direction), distance=distance, ignore=[self.entities[i]])
+            self.los_visible[i] = hit_info.hit and hit_info.entity == player
+        self.los_checked_at[refresh] = self.time
+        self.los_origins[refresh] = positions[refresh]
+        self.los_targets[refresh] = positions[refresh] + to_player[refresh]
+
+        self.rays_left -= len(refresh)
+        self.rays_cast += len(refresh)
+        self.rays_waiting = len(stale) - len(refresh)
+        self.rays_cast_total += len(refresh)
+        return candidates, self.los_visible[candidates]
+
+    def line_of_sight_stats(self):
+        return {
+            'rays_last_frame': self.rays_cast,
+            'waiting_last_frame': self.rays_waiting,
+            'rays_per_frame': self.rays_cast_total / max(self.frames, 1)
+        }
+
+    def ai_stats(self):
+        return dict(self.tier_counts, thinking_last_tick=self.ai_updates, enemies=self.count)
+
+    def assign_tiers(self, distances, to_player):
+        n = self.count
+        positions = self.positions[:n]
+        within = np.flatnonzero(distances < GameConfig.ai_mid_distance)
+        hidden = np.zeros(n, dtype=bool)
+        hidden[within], _ = game.ground.segments_hit(positions[within], positions[within] + to_player[within])
+
+        tiers = np.full(n, 2, dtype=np.int8)
+        tiers[~hidden & (distances < GameConfig.ai_mid_distance)] = 1
+        tiers[~hidden & (distances < GameConfig.ai_near_distance)] = 0
+        self.tiers[:n] = tiers
+        self.tier_counts = dict(zip(self.tier_names, np.bincount(tiers, minlength=3).tolist()))
+
+    def tick(self, dt, player):
+        self.time += dt
+        self.ticks += 1
+        n = self.count
+        if n == 0:
+            self.rays_waiting = 0
             return
-
-        # AI behavior
-        distance_vec = game.player.position - self.position
-        dist = distance_vec.length()
-
-        # Only proceed if within search radius
-        if dist < self.search_radius:
-            # Line of sight check
-            hit_info = raycast(self.position, distance_vec.normalized(), distance=dist, ignore=[self])
-            
-            # Move towards player if we have line of sight
-            if hit_info.hit and hit_info.entity == game.player:
-                # Calculate direction to player
-                direction = distance_vec.normalized()
-                
-                # Set target velocity based on direction and speed
-                target_velocity = direction * self.speed
-                current_velocity = Vec3(self.velocity.x, 0, self.velocity.z)
-                
-                # Apply acceleration towards target velocity
-                acceleration = (target_velocity - current_velocity) * 5
-                self.velocity.x += acceleration.x * time.dt
-                self.velocity.z += acceleration.z * time.dt
-                
-                # Update position
-                self.x += self.velocity.x * time.dt
-                self.z += self.velocity.z * time.dt
-
-                # Attack if in range
-                if dist < self.attack_range:
-                    self.attack_timer -= time.dt
-                    if self.attack_timer <= 0:
-                        self.attack()
-                        self.attack_timer = self.attack_cooldown
+        positions = self.positions[:n]
+        velocities = self.velocities[:n]
+        self.previous_positions[:n] = positions
+
+        # Gravity for enemies in the air, then snap to the ground
+        airborne = ~self.grounded[:n]
+        velocities[airborne, 1] += GameConfig.gravity * dt
+        positions[airborne, 1] += velocities[airborne, 1] * dt
+        ground_heights = self.field.get_heights(positions[:, 0], positions[:, 2]) + 1
+        landed = positions[:, 1] <= ground_heights
+        positions[landed, 1] = ground_heights[landed]
+        velocities[landed, 1] = 0
+        self.grounded[:n] = landed
+
+        # Enemies on snow (white terrain) stand still
+        active = ~self.field.is_snow(positions[:, 0], positions[:, 2])
+
+        to_player = np.array(tuple(player.position)) - positions
+        distances = np.linalg.norm(to_player, axis=1)
+        self.tier_timer -= dt
+        if self.tier_timer <= 0:
+            self.tier_timer = GameConfig.ai_tier_interval
+            self.assign_tiers(distances, to_player)
+
+        # Near enemies think every tick, mid range ones once ai_mid_interval has built up,
+        # stepping their AI by all the time since they last did
+        tiers = self.tiers[:n]
+        ai_dt = self.ai_dt[:n]
+        ai_dt += dt
+        thinking = (tiers == 0) | ((tiers == 1) & (ai_dt >= GameConfig.ai_mid_interval))
+        steps = np.where(thinking, ai_dt, 0.0)
+        ai_dt[thinking | (tiers == 2)] = 0
+        self.ai_updates = int(thinking.sum())
+
+        # Seek the player when within search radius and in line of sight
+        chasing = np.zeros(n, dtype=bool)
+        candidates = np.flatnonzero(thinking & active & (distances < self.search_radius) & (distances > 0))
+        visible_rows, visible = self.update_line_of_sight(candidates, to_player, distances, player)
+        chasing[visible_rows] = visible
+        moving = self.moving[:n]
+        moving[thinking] = chasing[thinking]
+
+        chasers = np.flatnonzero(chasing)
+        if len(chasers):
+            # Accelerate towards the target velocity on the ground plane
+            ground_plane = np.ix_(chasers, (0, 2))
+            target_velocities = to_player[ground_plane] / distances[chasers, None] * self.speed
+            blend = np.minimum(steps[chasers, None] * 5, 1)
+            velocities[ground_plane] += (target_velocities - velocities[ground_plane]) * blend
+
+            # Attack if in range
+            in_range = chasers[distances[chasers] < self.attack_range]
+            self.attack_timers[in_range] -= steps[in_range]
+            attackers = in_range[self.attack_timers[in_range] <= 0]
+            self.attack_timers[attackers] = self.attack_cooldown
+            for i in attackers.tolist():
+                self.entities[i].attack()
+
+        # Chasing enemies keep their last steering between thinks; far ones just drift
+        movers = np.flatnonzero(active & (moving | (tiers == 2)))
+        ground_plane = np.ix_(movers, (0, 2))
+        positions[ground_plane] += velocities[ground_plane] * dt
 
         # Prevent enemies from piling up
-        for enemy in game.enemies:
-            if enemy != self:
-                repel_distance = (enemy.position - self.position).length()
-                if repel_distance < 1.5:
-                    repel_dir = (self.position - enemy.position).normalized()
-                    self.position += repel_dir * time.dt * 2
+        if n > 1:
+            pairs = kd_tree(positions).query_pairs(self.separation_distance, output_type='ndarray')
+            if len(pairs):
+                offsets = positions[pairs[:, 0]] - positions[pairs[:, 1]]
+                lengths = np.linalg.norm(offsets, axis=1)
+                pairs, offsets, lengths = pairs[lengths > 0], offsets[lengths > 0], lengths[lengths > 0]
+                push = offsets / lengths[:, None] * dt * 2
+                np.add.at(positions, pairs[:, 0], push * active[pairs[:, 0], None])
+                np.add.at(positions, pairs[:, 1], -push * active[pairs[:, 1], None])
+
+# Live bullets in NumPy arrays, one row per bullet, advanced together once per tick.
+# Each tick sweeps every bullet's whole step against the terrain heightfield and the
+# bounding boxes of enemies and pickups, so a long step at a low tick rate can't pass
+# through anything. Bullet entities only mirror their row's position
+class ProjectileBatch(EntityRows):
+    index_name = 'batch_index'
+    columns = (
+        ('positions', (3,), float),
+        ('previous_positions', (3,), float),  # At the start of the last tick
+        ('velocities', (3,), float),
+        ('lifetimes', (), float),
+        ('damage', (), float)
+    )
+
+    def __init__(self, ground, capacity=128):
+        super().__init__(capacity)
+        self.ground = ground
+        self.hits = 0  # Last tick
+        self.pairs_tested = 0  # Bullet-box pairs that reached the exact test, last tick
+
+    def add(self, entity, position, velocity, lifetime, damage):
+        index = self.add_row(entity)
+        self.positions[index] = tuple(position)
+        self.previous_positions[index] = self.positions[index]
+        self.velocities[index] = tuple(velocity)
+        self.lifetimes[index] = lifetime
+        self.damage[index] = damage
+
+    def targets(self):
+        # Bounding boxes of everything a bullet can hit: enemies, then pickups
+        swarm = game.enemy_swarm
+        pickups = game.pickup_manager
+        centers = np.concatenate((swarm.positions[:swarm.count], pickups.positions[:pickups.count]))
+        half_extents = np.concatenate((swarm.half_extents[:swarm.count], pickups.half_extents[:pickups.count]))
+        return centers, half_extents, swarm.entities + pickups.entities
+
+    def sweep(self, starts, ends):
+        # Fraction of each segment travelled before its first hit (inf for none) and the
+        # index into targets() of what it hit (-1 for terrain or nothing)
+        n = len(starts)
+        hit_at = np.full(n, np.inf)
+        struck = np.full(n, -1)
+        deltas = ends - starts
+        lengths = np.linalg.norm(deltas, axis=1)
+
+        terrain, distances = self.ground.segments_hit(starts, ends)
+        terrain &= lengths > 0
+        hit_at[terrain] = distances[terrain] / lengths[terrain]
+
+        centers, half_extents, entities = self.targets()
+        self.pairs_tested = 0
+        if not entities:
+            return hit_at, struck, entities
+
+        # Broad phase: boxes whose bounding sphere reaches the sphere around the segment
+        tree = kd_tree(centers)
+        reach = lengths / 2 + np.linalg.norm(half_extents, axis=1).max()
+        candidates = tree.query_ball_point((starts + ends) / 2, reach, return_sorted=False)
+        counts = np.fromiter((len(found) for found in candidates), dtype=np.int64, count=n)
+        if counts.sum() == 0:
+            return hit_at, struck, entities
+        rows = np.repeat(np.arange(n), counts)
+        boxes = np.concatenate([found for found in candidates if found]).astype(np.int64)
+        self.pairs_tested = len(rows)
+
+        # Slab test of each segment against each candidate box
+        origins = starts[rows]
+        directions = deltas[rows]
+        low = centers[boxes] - half_extents[boxes]
+        high = centers[boxes] + half_extents[boxes]
+        moving = directions != 0
+        inside = (origins >= low) & (origins <= high)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_low = (low - origins) / directions
+            t_high = (high - origins) / directions
+        near = np.where(moving, np.minimum(t_low, t_high), np.where(inside, -np.inf, np.inf))
+        far = np.where(moving, np.maximum(t_low, t_high), np.where(inside, np.inf, -np.inf))
+        entry = near.max(axis=1)
+        exit = far.min(axis=1)
+        touched = (entry <= exit) & (exit >= 0) & (entry <= 1)
+        rows, boxes, entry = rows[touched], boxes[touched], np.maximum(entry[touched], 0)
+
+        # Nearest box per bullet, kept where it comes before the terrain
+        order = np.lexsort((entry, rows))
+        rows, boxes, entry = rows[order], boxes[order], entry[order]
+        first = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]]) if len(rows) else rows
+        rows, boxes, entry = rows[first], boxes[first], entry[first]
+        closer = entry < hit_at[rows]
+        hit_at[rows[closer]] = entry[closer]
+        struck[rows[closer]] = boxes[closer]
+        return hit_at, struck, entities
+
+    def tick(self, dt):
+        self.hits = 0
+        n = self.count
+        if n == 0:
+            return
+        self.previous_positions[:n] = self.positions[:n]
+        self.lifetimes[:n] -= dt
+        starts = self.positions[:n].copy()
+        ends = starts + self.velocities[:n] * dt
+        hit_at, struck, targets = self.sweep(starts, ends)
+        self.positions[:n] = ends
+
+        hits = np.flatnonzero(hit_at <= 1)
+        self.hits = len(hits)
+        points = starts[hits] + (ends[hits] - starts[hits]) * hit_at[hits, None]
+        damage = self.damage[hits]
+        finished = [self.entities[i] for i in hits.tolist()]
+        finished += [self.entities[i] for i in np.flatnonzero((hit_at > 1) & (self.lifetimes[:n] <= 0)).tolist()]
+
+        # Damage after the sweep, since kills reorder the swarm. A pickup is collected
+        # by the first bullet to reach it; later ones this tick just stop there
+        enemy_count = len(game.enemy_swarm.entities)
+        collected = set()
+        for target_index, point, amount in zip(struck[hits].tolist(), points.tolist(), damage.tolist()):
+            if target_index < 0:
+                continue
+            if target_index >= enemy_count:
+                if target_index in collected:
+                    continue
+                collected.add(target_index)
+            targets[target_index].take_damage(amount)
+            # Add impact effect
+            game.spawn_impact(point)
+
+        for bullet in finished:
+            game.despawn_bullet(bullet)
 
 class Bullet(Entity):
-    def __init__(self, position, direction):
+    # Bullets live in game.bullet_pool and fly in game.projectiles; fire them with
+    # game.fire_bullet
+    speed = 50
+    lifetime = 2
+    damage = 25
+
+    def __init__(self):
         super().__init__(
             model='sphere',
             color=color.yellow,
-            scale=0.3,
-            position=position,
-            collider='sphere'
+            scale=0.3
         )
-        self.direction = direction
-        self.speed = 50
-        self.lifetime = 2
-        self.damage = 25
+        self.batch_index = None
         
         # Add trail effect
         self.trail = Entity(
@@ -429,35 +1793,116 @@ class Bullet(Entity):
             scale=(0.1, 0.1, 0.5)
         )
 
-    def update(self):
-        self.lifetime -= time.dt
-        if self.lifetime <= 0:
-            destroy(self.trail)
-            destroy(self)
+    def launch(self, position, direction):
+        self.position = position
+        self.trail.look_at(self.position + direction)
+        game.projectiles.add(self, position, direction * self.speed, self.lifetime, self.damage)
+
+# Short-lived particles for hit, death and pickup effects in one preallocated buffer, drawn
+# as a single node of camera-facing quads (same vertex layout as terrain chunks). Live
+# particles stay packed at the front of the arrays; when the buffer is full, new particles
+# are dropped rather than growing it
+class ParticleEmitter:
+    gravity = -15
+    columns = ('positions', 'velocities', 'ages', 'lifetimes', 'sizes', 'colors')
+    bursts = {
+        # Kind: (particles, speed, lifetime, size)
+        'impact': (8, 6, 0.25, 0.25),
+        'death': (32, 8, 0.8, 0.5),
+        'pickup': (16, 4, 0.5, 0.2)
+    }
+
+    def __init__(self, parent, capacity):
+        self.capacity = capacity
+        self.count = 0
+        self.positions = np.zeros((capacity, 3))
+        self.velocities = np.zeros((capacity, 3))
+        self.ages = np.zeros(capacity)
+        self.lifetimes = np.ones(capacity)
+        self.sizes = np.zeros(capacity)
+        self.colors = np.zeros((capacity, 4), dtype=np.float32)
+        self.peak = 0  # Most particles alive at once
+        self.dropped = 0  # Particles not emitted because the buffer was full
+
+        # Quad corners, UVs and triangles for every slot, sliced to the live count when drawing
+        self.corners = np.array([(-1, -1), (1, -1), (1, 1), (-1, 1)], dtype=np.float64)
+        self.quad_uvs = np.tile(((self.corners + 1) / 2).astype(np.float32), (capacity, 1))
+        self.quad_triangles = (
+            np.arange(capacity, dtype=np.uint32)[:, None] * 4 + np.array((0, 1, 2, 0, 2, 3), dtype=np.uint32)
+        ).ravel()
+        geom = Geom(GeomVertexData('particles', CHUNK_VERTEX_FORMAT, Geom.UH_dynamic))
+        primitive = GeomTriangles(Geom.UH_dynamic)
+        primitive.set_index_type(Geom.NT_uint32)
+        geom.add_primitive(primitive)
+        node = GeomNode('particles')
+        node.add_geom(geom)
+        self.node = parent.attach_new_node(node)
+        self.node.set_light_off()
+        self.node.set_two_sided(True)
+        self.drawn = 0  # Particles in the geometry
+
+    def __len__(self):
+        return self.count
+
+    def burst(self, kind, position, burst_color, scale=1):
+        count, speed, lifetime, size = self.bursts[kind]
+        self.emit(position, int(count * scale), burst_color, speed * scale, lifetime, size * scale)
+
+    def emit(self, position, count, particle_color, speed, lifetime, size):
+        free = self.capacity - self.count
+        if count > free:
+            self.dropped += count - free
+            count = free
+        if count <= 0:
             return
-
-        # Update bullet position with physics
-        ray = raycast(self.position, self.direction, distance=self.speed * time.dt, ignore=[self, game.player])
-        if ray.hit:
-            if hasattr(ray.entity, 'take_damage'):
-                ray.entity.take_damage(self.damage)
-                # Add impact effect
-                impact = Entity(
-                    model='sphere',
-                    color=color.yellow,
-                    scale=0.5,
-                    position=ray.world_point
-                )
-                impact.animate_scale(0, duration=0.2)
-                destroy(impact, delay=0.2)
-            destroy(self.trail)
-            destroy(self)
+        rows = slice(self.count, self.count + count)
+        directions = np.random.normal(size=(count, 3))
+        directions /= np.linalg.norm(directions, axis=1, keepdims=True) + 1e-9
+        self.velocities[rows] = directions * (speed * np.random.uniform(0.5, 1, (count, 1)))
+        self.velocities[rows, 1] += speed * 0.5  # Bursts lean upwards
+        self.positions[rows] = tuple(position)[:3]
+        self.ages[rows] = 0
+        self.lifetimes[rows] = lifetime * np.random.uniform(0.6, 1, count)
+        self.sizes[rows] = size * np.random.uniform(0.6, 1, count)
+        self.colors[rows] = tuple(particle_color)
+        self.count += count
+        self.peak = max(self.peak, self.count)
+
+    def clear(self):
+        self.count = 0
+
+    def tick(self, dt):
+        n = self.count
+        if n == 0:
             return
-
-        self.position += self.direction * self.speed * time.dt
-        
-        # Update trail position
-        self.trail.look_at(self.position + self.direction)
+        self.ages[:n] += dt
+        alive = self.ages[:n] < self.lifetimes[:n]
+        if not alive.all():
+            for name in self.columns:
+                column = getattr(self, name)
+                kept = column[:n][alive]
+                column[:len(kept)] = kept
+            n = self.count = int(alive.sum())
+        self.velocities[:n, 1] += self.gravity * dt
+        self.positions[:n] += self.velocities[:n] * dt
+
+    def render(self):
+        # Rewrite the quads facing the camera; particles shrink away over their lifetime
+        n = self.count
+        if n == 0 and self.drawn == 0:
+            return
+        right = np.array(tuple(camera.right))
+        up = np.array(tuple(camera.up))
+        half = self.sizes[:n] * (1 - self.ages[:n] / self.lifetimes[:n]) / 2
+        offsets = self.corners[:, 0, None] * right + self.corners[:, 1, None] * up
+        vertices = self.positions[:n, None, :] + half[:, None, None] * offsets
+        geom = self.node.node().modify_geom(0)
+        vertex_data = geom.modify_vertex_data()
+        vertex_data.unclean_set_num_rows(n * 4)
+        for index, array in enumerate((vertices.reshape(-1, 3), np.repeat(self.colors[:n], 4, axis=0), self.quad_uvs[:n * 4])):
+            vertex_data.modify_array_handle(index).copy_data_from(np.ascontiguousarray(array, dtype=np.float32))
+        geom.modify_primitive(0).modify_vertices().modify_handle().copy_data_from(self.quad_triangles[:n * 6])
+        self.drawn = n
 
 class Player(Entity):
     def __init__(self, **kwargs):
@@ -519,8 +1964,8 @@ class Player(Entity):
     def die(self):
         if not self.is_dead:
             self.is_dead = True
-            GameConfig.stop_sound(game.background_music)
-            GameConfig.play_sound(game.death_sound)
+            GameConfig.stop_sound('music')
+            GameConfig.play_sound('death')
             speak_async(random.choice(DEATH_PHRASES))
             game.show_game_over()
             mouse.locked = False
@@ -529,19 +1974,18 @@ class Player(Entity):
         if self.is_grounded:  # Remove cooldown check
             self.velocity_y = GameConfig.jump_force
             self.is_grounded = False
-            if game.jump_sound:
-                GameConfig.play_sound(game.jump_sound)
+            GameConfig.play_sound('jump')
 
-    def update(self):
+    def tick(self, dt):
         if self.is_dead:
             return
 
         # Apply gravity
         if not self.is_grounded:
-            self.velocity_y += GameConfig.gravity * time.dt
+            self.velocity_y += GameConfig.gravity * dt
 
         # Update position
-        self.y += self.velocity_y * time.dt
+        self.y += self.velocity_y * dt
 
         # Ground check
         ground_height = game.field.get_height(self.x, self.z) + 1
@@ -588,15 +2032,14 @@ class Weapon(Entity):
     def shoot(self):
         if self.timer <= 0 and not self.game.game_over:
             self.timer = self.cooldown
-            if self.game.shoot_sound:
-                GameConfig.play_sound(self.game.shoot_sound)
+            GameConfig.play_sound('shoot')
                 
             # Create two slightly spread bullets for better fire pattern
             bullet_direction = camera.forward
             spread = 0.02  # Small spread amount
             
             # Center bullet
-            Bullet(
+            self.game.fire_bullet(
                 position=camera.world_position + bullet_direction * 2,
                 direction=bullet_direction
             )
@@ -609,8 +2052,8 @@ class Weapon(Entity):
                                              random.uniform(-spread, spread), 
                                              random.uniform(-spread, spread))
             
-            Bullet(position=camera.world_position + left_dir * 2, direction=left_dir)
-            Bullet(position=camera.world_position + right_dir * 2, direction=right_dir)
+            self.game.fire_bullet(position=camera.world_position + left_dir * 2, direction=left_dir)
+            self.game.fire_bullet(position=camera.world_position + right_dir * 2, direction=right_dir)
 
             # Simple recoil animation
             self.animate_rotation((45, 0, -10), duration=0.05)
@@ -618,9 +2061,9 @@ class Weapon(Entity):
             self.animate_position(self.position - Vec3(0.05, 0, 0), duration=0.05)
             self.animate_position(self.position, delay=0.05, duration=0.1)
 
-    def update(self):
+    def tick(self, dt):
         if self.timer > 0:
-            self.timer -= time.dt
+            self.timer -= dt
 
 class ButtonList(Entity):
     def __init__(self, button_dict, y=0, parent=None):
@@ -744,10 +2187,10 @@ Tips:
         for button in self.button_list.buttons:
             if button.text.startswith('Sound:'):
                 button.text = f'Sound: {"ON" if GameConfig.sound_enabled else "OFF"}'
-        if GameConfig.sound_enabled and game.background_music and not game.background_music.playing:
-            GameConfig.play_sound(game.background_music)
-        elif not GameConfig.sound_enabled and game.background_music:
-            GameConfig.stop_sound(game.background_music)
+        if GameConfig.sound_enabled and not GameConfig.sound_playing('music'):
+            GameConfig.play_sound('music')
+        elif not GameConfig.sound_enabled:
+            GameConfig.stop_sound('music')
 
     def toggle_speech(self):
         GameConfig.text_to_speech_enabled = not GameConfig.text_to_speech_enabled
@@ -771,19 +2214,33 @@ class ThinkingFieldsGame(Entity):
         self.game_over = False
 
         # Initialize field and terrain
-        self.field = ThinkingField(size=(64, 64), correlation_length=4.0, amplitude=8.0)
-        self.terrain_chunks = {}
-        self.chunk_size = 16
-        self.render_distance = 3
+        self.field = create_field()
+        self.chunk_size = GameConfig.chunk_size
+        self.render_distance = GameConfig.lod_render_distance if GameConfig.terrain_lod else 3
+        self.terrain_chunks = ToroidalChunkGrid(self.render_distance)  # chunk -> (node, LOD variant)
+        self.terrain_root = scene.attach_new_node('terrain')  # Chunks are plain nodes, not entities
+        self.player_chunk = None  # Chunk the terrain was last laid out around
+        self.missing_chunks = []  # (chunk, variant) still to attach, nearest first
+        self.finished_chunks = {}  # Built off-thread, keyed by tile, waiting to be attached
+        self.chunk_workers = ChunkWorkerPool(GameConfig.chunk_workers)
+        self.chunk_geometry = ChunkGeometryCache(GameConfig.chunk_geometry_cache_size)
+        self.chunk_pack = None  # Only for terrain that is the same every launch
+        if GameConfig.chunk_packs and (GameConfig.world_path or GameConfig.terrain_seed is not None):
+            self.chunk_pack = ChunkMeshPack(chunk_pack_path(self.field, self.chunk_size))
+        self.ground = HeightfieldCollider(self.field)
+        startup_profile.mark('terrain field')
 
         # Create sky
         self.sky = Sky()
+        startup_profile.mark('sky')
 
         # Initialize sounds
+        self.assets = AssetLoader(GameConfig.asset_workers)
         GameConfig.initialize_sounds(self)
+        startup_profile.mark('sound queue')
 
         # Create player
-        self.player = Player(model='cube', color=color.azure, position=(32, 5, 32), scale=(1, 2, 1))
+        self.player = Player(model='cube', color=color.azure, position=GameConfig.spawn_position, scale=(1, 2, 1))
 
         self.camera_pivot = Entity(parent=self.player, y=1.5)
         camera.parent = self.camera_pivot
@@ -794,9 +2251,27 @@ class ThinkingFieldsGame(Entity):
         # Initialize other components
         self.weapon = Weapon(self)
         self.weapon.enabled = False  # Initially hidden
-        self.enemies = []
+        self.enemy_swarm = EnemySwarm(self.field)
+        self.enemies = self.enemy_swarm.entities
         self.enemy_spawn_timer = 0
         self.enemy_spawn_interval = 3  # Reduced spawn interval
+        self.projectiles = ProjectileBatch(self.ground)
+        self.bullets = self.projectiles.entities
+        self.bullet_pool = EntityPool(Bullet, GameConfig.bullet_pool_size)
+        self.particles = ParticleEmitter(scene, GameConfig.particle_capacity)
+        self.pickup_manager = PickupManager()
+        self.pickups = self.pickup_manager.entities
+
+        # Simulation systems, in the order they run each tick
+        self.scheduler = SimulationScheduler(GameConfig.tick_rate, GameConfig.max_ticks_per_frame)
+        self.scheduler.register('player', self.tick_player)
+        self.scheduler.register('enemies', self.tick_enemies)
+        self.scheduler.register('bullets', self.tick_bullets)
+        self.scheduler.register('particles', self.particles.tick)
+        self.scheduler.register('pickups', self.tick_pickups)
+        self.scheduler.register('spawning', self.tick_spawning)
+        self.scheduler.track(self.player)
+        startup_profile.mark('player and systems')
 
         self.quote_timer = 0
         self.current_quote_index = 0
@@ -813,32 +2288,28 @@ class ThinkingFieldsGame(Entity):
 
         # Initialize Score
         self.score = 0
-
-    def get_color_from_height(self, height):
-        if height < 1:
-            return color.rgb(0.6, 0.3, 0.2)  # Brown for low areas
-        elif height < 3:
-            return color.rgb(0.9, 0.8, 0.5)  # Sand
-        elif height < 7:
-            return color.rgb(0.2, 0.8, 0.2)  # Grass
-        elif height < 10:
-            return color.rgb(0.5, 0.5, 0.5)  # Mountain
-        else:
-            return color.rgb(1, 1, 1)  # Snow
+        startup_profile.mark('menu')
 
     def reset_game(self):
         # Destroy existing enemies and pickups
         [destroy(e) for e in self.enemies]
-        self.enemies = []
+        self.enemy_swarm = EnemySwarm(self.field)
+        self.enemies = self.enemy_swarm.entities
+        for bullet in self.bullets[:]:
+            self.despawn_bullet(bullet)
+        self.particles.clear()
+        for pickup in self.pickups[:]:
+            self.despawn_pickup(pickup)
         for e in scene.entities:
-            if isinstance(e, (HealthPill, ArmorPickup, Bullet, Enemy)):
+            if isinstance(e, (HealthPill, ArmorPickup, Enemy)):
                 destroy(e)
 
         # Reset player stats and position
         self.player.health = self.player.max_health
         self.player.armor = self.player.max_armor
         self.player.update_bars()
-        self.player.position = Vec3(32, 5, 32)
+        self.player.position = Vec3(*GameConfig.spawn_position)
+        self.scheduler.track(self.player)
         self.player.is_dead = False
         self.player.score = 0
         self.player.update_bars()
@@ -859,8 +2330,8 @@ class ThinkingFieldsGame(Entity):
         self.spawn_initial_enemies()
 
         # Play background music if enabled
-        if GameConfig.sound_enabled and self.background_music:
-            GameConfig.play_sound(self.background_music)
+        if GameConfig.sound_enabled:
+            GameConfig.play_sound('music')
 
         # Lock mouse
         mouse.locked = True
@@ -898,7 +2369,6 @@ class ThinkingFieldsGame(Entity):
 
         enemy = Enemy(position=(x, y, z))
         enemy.game = self
-        self.enemies.append(enemy)
         print(f"Spawned enemy at position: ({x:.2f}, {y:.2f}, {z:.2f})")  # Debugging statement
 
     def spawn_pickup(self):
@@ -912,71 +2382,139 @@ class ThinkingFieldsGame(Entity):
         else:
             ArmorPickup(position=spawn_pos)
 
+    def chunk_tile_key(self, chunk_x, chunk_z):
+        return chunk_tile_key(self.field, chunk_x, chunk_z, self.chunk_size)
+
+    def chunk_variants_around(self, player_chunk_x, player_chunk_z):
+        return chunk_variants_around(player_chunk_x, player_chunk_z, self.render_distance, self.chunk_size)
+
     def update_terrain(self):
-        player_chunk_x = int(self.player.x // self.chunk_size)
-        player_chunk_z = int(self.player.z // self.chunk_size)
-
-        for dx in range(-self.render_distance, self.render_distance + 1):
-            for dz in range(-self.render_distance, self.render_distance + 1):
-                chunk_x = player_chunk_x + dx
-                chunk_z = player_chunk_z + dz
-                self.generate_chunk(chunk_x, chunk_z)
-
-        # Clean up old chunks
-        for (chunk_x, chunk_z) in list(self.terrain_chunks.keys()):
-            if abs(chunk_x - player_chunk_x) > self.render_distance or \
-               abs(chunk_z - player_chunk_z) > self.render_distance:
-                destroy(self.terrain_chunks[(chunk_x, chunk_z)])
-                del self.terrain_chunks[(chunk_x, chunk_z)]
-
-    def generate_chunk(self, chunk_x, chunk_z):
-        if (chunk_x, chunk_z) in self.terrain_chunks:
+        player_chunk = (int(self.player.x // self.chunk_size), int(self.player.z // self.chunk_size))
+        if player_chunk != self.player_chunk or self.terrain_chunks.radius != self.render_distance:
+            self.relayout_terrain(player_chunk)
+        if self.missing_chunks:
+            self.upload_finished_chunks()
+
+    def relayout_terrain(self, player_chunk):
+        # Runs only when the player enters another chunk. Chunks that left the render
+        # distance are the old square minus the new one
+        r = self.render_distance
+        new_range = {
+            (player_chunk[0] + dx, player_chunk[1] + dz)
+            for dx in range(-r, r + 1) for dz in range(-r, r + 1)
+        }
+        if self.player_chunk is None or self.terrain_chunks.radius != r:
+            removed = {key for key, _ in self.terrain_chunks.items()} - new_range
+        else:
+            old_r = self.terrain_chunks.radius
+            removed = {
+                (self.player_chunk[0] + dx, self.player_chunk[1] + dz)
+                for dx in range(-old_r, old_r + 1) for dz in range(-old_r, old_r + 1)
+            } - new_range
+        for key in removed:
+            chunk = self.terrain_chunks.pop(key)
+            if chunk:
+                chunk[0].remove_node()
+        if self.terrain_chunks.radius != r:
+            kept = self.terrain_chunks.items()
+            self.terrain_chunks = ToroidalChunkGrid(r)
+            for key, chunk in kept:
+                self.terrain_chunks[key] = chunk
+        self.player_chunk = player_chunk
+
+        # Chunks that are missing or were built for a different LOD. Outdated chunks stay
+        # visible until their replacement is attached
+        variants = self.chunk_variants_around(*player_chunk)
+        self.missing_chunks = [
+            (key, variant) for key, variant in variants.items()
+            if self.terrain_chunks.get(key, (None, None))[1] != variant
+        ]
+        self.missing_chunks.sort(
+            key=lambda item: (item[0][0] - player_chunk[0]) ** 2 + (item[0][1] - player_chunk[1]) ** 2
+        )
+
+        wanted_geometry = set()
+        for key, variant in self.missing_chunks:
+            geometry_key = (self.chunk_tile_key(*key), variant)
+            wanted_geometry.add(geometry_key)
+            if geometry_key in self.chunk_geometry or geometry_key in self.finished_chunks:
+                continue
+            if self.chunk_pack is None or geometry_key not in self.chunk_pack:
+                self.chunk_workers.submit(
+                    geometry_key, build_chunk_arrays,
+                    self.field, key[0], key[1], self.chunk_size, variant
+                )
+
+        # Drop requests no missing chunk is waiting for
+        for geometry_key in list(self.chunk_workers.pending):
+            if geometry_key not in wanted_geometry:
+                self.chunk_workers.cancel(geometry_key)
+        for geometry_key in list(self.finished_chunks):
+            if geometry_key not in wanted_geometry:
+                del self.finished_chunks[geometry_key]
+
+        # Never leave the player standing on a missing chunk
+        self.generate_chunk(player_chunk[0], player_chunk[1], variants[player_chunk])
+        self.missing_chunks = [item for item in self.missing_chunks if item[0] != player_chunk]
+
+    def upload_finished_chunks(self):
+        self.finished_chunks.update(self.chunk_workers.pop_finished())
+
+        # Attach nearest chunks first. Cached tiles only cost a node copy; new meshes are
+        # limited to a few per frame. Both stop once the frame's time budget is spent
+        start = time.perf_counter()
+        built = 0
+        still_missing = []
+        for index, ((chunk_x, chunk_z), variant) in enumerate(self.missing_chunks):
+            if (time.perf_counter() - start) * 1000 >= GameConfig.chunk_upload_budget_ms:
+                still_missing.extend(self.missing_chunks[index:])
+                break
+            geometry_key = (self.chunk_tile_key(chunk_x, chunk_z), variant)
+            if geometry_key in self.chunk_geometry:
+                self.attach_chunk(chunk_x, chunk_z, variant)
+            elif geometry_key in self.finished_chunks and built < GameConfig.chunk_uploads_per_frame:
+                self.attach_chunk(chunk_x, chunk_z, variant, self.finished_chunks.pop(geometry_key))
+                built += 1
+            elif self.chunk_pack is not None and geometry_key in self.chunk_pack and built < GameConfig.chunk_uploads_per_frame:
+                self.attach_chunk(chunk_x, chunk_z, variant, self.chunk_pack.get(geometry_key))
+                built += 1
+            else:
+                still_missing.append(((chunk_x, chunk_z), variant))
+        self.missing_chunks = still_missing
+
+    def generate_chunk(self, chunk_x, chunk_z, variant=(1, 1, 1, 1, 1)):
+        # Synchronous build, used when a chunk is needed this frame
+        if self.terrain_chunks.get((chunk_x, chunk_z), (None, None))[1] == variant:
             return
 
-        vertices = []
-        triangles = []
-        colors = []
-        uvs = []
-
-        for x in range(self.chunk_size):
-            for z in range(self.chunk_size):
-                world_x = chunk_x * self.chunk_size + x
-                world_z = chunk_z * self.chunk_size + z
-
-                h1 = self.field.get_height(world_x, world_z)
-                h2 = self.field.get_height(world_x + 1, world_z)
-                h3 = self.field.get_height(world_x, world_z + 1)
-                h4 = self.field.get_height(world_x + 1, world_z + 1)
-
-                vertices.extend([
-                    Vec3(x, h1, z),
-                    Vec3(x + 1, h2, z),
-                    Vec3(x, h3, z + 1),
-                    Vec3(x + 1, h4, z + 1)
-                ])
-
-                offset = len(vertices) - 4
-                triangles.extend([
-                    (offset, offset + 1, offset + 2),
-                    (offset + 1, offset + 3, offset + 2)
-                ])
-
-                uvs.extend([
-                    (x / self.chunk_size, z / self.chunk_size),
-                    ((x + 1) / self.chunk_size, z / self.chunk_size),
-                    (x / self.chunk_size, (z + 1) / self.chunk_size),
-                    ((x + 1) / self.chunk_size, (z + 1) / self.chunk_size)
-                ])
-
-                for h in [h1, h2, h3, h4]:
-                    colors.append(self.get_color_from_height(h))
-
-        chunk = Entity(
-            model=Mesh(vertices=vertices, triangles=triangles, colors=colors, uvs=uvs),
-            collider='mesh',
-            position=Vec3(chunk_x * self.chunk_size, 0, chunk_z * self.chunk_size)
+        geometry_key = (self.chunk_tile_key(chunk_x, chunk_z), variant)
+        arrays = None
+        if geometry_key not in self.chunk_geometry:
+            self.chunk_workers.cancel(geometry_key)
+            arrays = self.finished_chunks.pop(geometry_key, None)
+            if arrays is None and self.chunk_pack is not None and geometry_key in self.chunk_pack:
+                arrays = self.chunk_pack.get(geometry_key)
+            if arrays is None:
+                arrays = build_chunk_arrays(
+                    self.field, chunk_x, chunk_z, self.chunk_size, variant
+                )
+        self.attach_chunk(chunk_x, chunk_z, variant, arrays)
+
+    def attach_chunk(self, chunk_x, chunk_z, variant, arrays=None):
+        geometry_key = (self.chunk_tile_key(chunk_x, chunk_z), variant)
+        if geometry_key in self.chunk_geometry:
+            self.chunk_geometry.hits += 1
+        else:
+            self.chunk_geometry.add(geometry_key, arrays)
+            if self.chunk_pack is not None:
+                self.chunk_pack.put(geometry_key, arrays)
+        old_chunk = self.terrain_chunks.pop((chunk_x, chunk_z))
+        if old_chunk:
+            old_chunk[0].remove_node()
+        chunk = self.chunk_geometry.instantiate(
+            geometry_key, self.terrain_root, Vec3(chunk_x * self.chunk_size, 0, chunk_z * self.chunk_size)
         )
-        self.terrain_chunks[(chunk_x, chunk_z)] = chunk
+        self.terrain_chunks[(chunk_x, chunk_z)] = (chunk, variant)
 
     def show_game_over(self):
         self.game_over = True
@@ -997,13 +2535,19 @@ class ThinkingFieldsGame(Entity):
             self.game_started = True
             self.game_paused = False
 
+            # The only place that waits for assets, and only for those played right away
+            waited = self.assets.wait([name for name in GameConfig.first_frame_assets if name in self.assets])
+            self.sounds.collect_loaded()
+            if GameConfig.profile_startup:
+                print(f"First frame assets ready (waited {waited:.0f} ms): {self.assets.report()}")
+
             # Play start sound
-            if GameConfig.sound_enabled and self.start_sound:
-                GameConfig.play_sound(self.start_sound)
+            if GameConfig.sound_enabled:
+                GameConfig.play_sound('start')
 
             # Play background music if enabled and not already playing
-            if GameConfig.sound_enabled and self.background_music and not self.background_music.playing:
-                GameConfig.play_sound(self.background_music)
+            if GameConfig.sound_enabled and not GameConfig.sound_playing('music'):
+                GameConfig.play_sound('music')
 
             # Spawn initial enemies
             self.spawn_initial_enemies()
@@ -1029,8 +2573,8 @@ class ThinkingFieldsGame(Entity):
         if self.game_started and not self.game_over:
             self.game_paused = False
             mouse.locked = True
-            if GameConfig.sound_enabled and self.background_music and not self.background_music.playing:
-                GameConfig.play_sound(self.background_music)
+            if GameConfig.sound_enabled and not GameConfig.sound_playing('music'):
+                GameConfig.play_sound('music')
             
             # Show the weapon when resumed
             self.weapon.enabled = True
@@ -1064,73 +2608,102 @@ class ThinkingFieldsGame(Entity):
             self.reset_game()
             speak_async("Welcome back to CubeTrix!")
 
+    def fire_bullet(self, position, direction):
+        bullet = self.bullet_pool.acquire()
+        bullet.launch(position, direction)
+        return bullet
+
+    def despawn_bullet(self, bullet):
+        self.projectiles.remove(bullet)
+        self.bullet_pool.release(bullet)
+
+    def spawn_impact(self, position):
+        self.particles.burst('impact', position, color.yellow)
+
+    def despawn_pickup(self, pickup):
+        self.pickup_manager.remove(pickup)
+        destroy(pickup)
+
     def update_enemies(self):
-        for enemy in self.enemies[:]:
-            distance = (enemy.position - self.player.position).length()
-            if distance > 50:  # Maximum distance before despawning
-                destroy(enemy)
-                self.enemies.remove(enemy)
+        for enemy in self.enemy_swarm.beyond(self.player.position, GameConfig.enemy_despawn_distance):
+            self.enemy_swarm.remove(enemy)
+            destroy(enemy)
 
-    def update(self):
-        if not self.game_started or self.game_paused or self.game_over:
-            return
+    def tick_player(self, dt):
+        # Handle player movement
+        move_direction = Vec3(
+            self.camera_pivot.forward * (held_keys['w'] - held_keys['s']) +
+            self.camera_pivot.right * (held_keys['d'] - held_keys['a'])
+        ).normalized()
 
-        # Set time scale to normal as levels are removed
-        time.time_scale = 1.0
+        # Implement running only when shift is held
+        run_multiplier = 2 if held_keys['shift'] else 1
 
-        # Update player physics
-        if self.player:
-            self.player.update()
+        if move_direction.length() > 0:
+            self.player.position += move_direction * 5 * dt * run_multiplier
+            self.player.is_moving = True
+            # Play footstep sound if not already playing
+            if GameConfig.sound_enabled and not GameConfig.sound_playing('step'):
+                GameConfig.play_sound('step')
+        else:
+            self.player.is_moving = False
+            # Stop footstep sound if playing
+            if GameConfig.sound_enabled and GameConfig.sound_playing('step'):
+                GameConfig.stop_sound('step')
 
-        # Update terrain
-        self.update_terrain()
+        # Update player physics
+        self.player.tick(dt)
+        self.weapon.tick(dt)
 
-        # Update enemies
-        for enemy in self.enemies:
-            enemy.update()
+    def tick_enemies(self, dt):
+        self.enemy_swarm.tick(dt, self.player)
 
         # Despawn enemies far from the player
         self.update_enemies()
 
+    def tick_bullets(self, dt):
+        self.projectiles.tick(dt)
+
+    def tick_pickups(self, dt):
+        self.pickup_manager.tick(dt, self.player)
+
+    def tick_spawning(self, dt):
         # Handle pickup spawning
-        GameConfig.pickup_timer += time.dt
+        GameConfig.pickup_timer += dt
         if GameConfig.pickup_timer >= GameConfig.pickup_interval:
             GameConfig.pickup_timer = 0
             self.spawn_pickup()
 
         # Handle quotes
-        self.quote_timer += time.dt
+        self.quote_timer += dt
         if self.quote_timer >= GameConfig.quote_interval:
             self.quote_timer = 0
             self.current_quote_index = (self.current_quote_index + 1) % len(self.quotes)
             speak_async(self.quotes[self.current_quote_index])
 
         # Handle enemy spawning
-        self.enemy_spawn_timer += time.dt
+        self.enemy_spawn_timer += dt
         if self.enemy_spawn_timer >= self.enemy_spawn_interval:
             self.enemy_spawn_timer = 0
             self.spawn_enemy()
 
-        # Handle player movement
-        move_direction = Vec3(
-            self.camera_pivot.forward * (held_keys['w'] - held_keys['s']) +
-            self.camera_pivot.right * (held_keys['d'] - held_keys['a'])
-        ).normalized()
+    def update(self):
+        if not self.game_started or self.game_paused or self.game_over:
+            return
 
-        # Implement running only when shift is held
-        run_multiplier = 2 if held_keys['shift'] else 1
+        # Set time scale to normal as levels are removed
+        time.time_scale = 1.0
 
-        if move_direction.length() > 0:
-            self.player.position += move_direction * 5 * time.dt * run_multiplier
-            self.player.is_moving = True
-            # Play footstep sound if not already playing
-            if GameConfig.sound_enabled and self.footstep_sound and not self.footstep_sound.playing:
-                GameConfig.play_sound(self.footstep_sound, volume=0.5)
-        else:
-            self.player.is_moving = False
-            # Stop footstep sound if playing
-            if GameConfig.sound_enabled and self.footstep_sound and self.footstep_sound.playing:
-                GameConfig.stop_sound(self.footstep_sound)
+        # Run the simulation ticks due this frame, then draw enemies and bullets between the last two
+        self.enemy_swarm.begin_frame()
+        self.scheduler.advance(time.dt)
+        self.enemy_swarm.render(self.scheduler.alpha)
+        self.projectiles.render(self.scheduler.alpha)
+        self.particles.render()
+
+        # Terrain streaming and uploads are budgeted per rendered frame, so they stay
+        # out of the simulation ticks
+        self.update_terrain()
 
         # Handle camera rotation
         if mouse.locked:
@@ -1138,8 +2711,59 @@ class ThinkingFieldsGame(Entity):
             self.camera_pivot.rotation_y += mouse.velocity.x * 40
             self.camera_pivot.rotation_x = clamp(self.camera_pivot.rotation_x, -90, 90)
 
+# Offline pack filling. Worker processes each build their own field from the same settings
+pregeneration_field = None
+
+def init_pregeneration_worker(world_path, terrain_seed):
+    global pregeneration_field
+    GameConfig.world_path = world_path
+    GameConfig.terrain_seed = terrain_seed
+    pregeneration_field = create_field()
+
+def build_chunk_batch(batch):
+    return [
+        (geometry_key, build_chunk_arrays(pregeneration_field, chunk_x, chunk_z, GameConfig.chunk_size, geometry_key[1]))
+        for geometry_key, (chunk_x, chunk_z) in batch
+    ]
+
+def pregenerate_chunks(radius, jobs=None):
+    # Pack every chunk and LOD variant the game can ask for while the player stays within
+    # `radius` chunks of spawn
+    if not GameConfig.world_path and GameConfig.terrain_seed is None:
+        raise ValueError('Pregeneration needs a world or a terrain seed')
+    field = create_field()
+    chunk_size = GameConfig.chunk_size
+    render_distance = GameConfig.lod_render_distance if GameConfig.terrain_lod else 3
+    pack = ChunkMeshPack(chunk_pack_path(field, chunk_size))
+
+    spawn_x = int(GameConfig.spawn_position[0] // chunk_size)
+    spawn_z = int(GameConfig.spawn_position[2] // chunk_size)
+    wanted = {}
+    for player_x in range(spawn_x - radius, spawn_x + radius + 1):
+        for player_z in range(spawn_z - radius, spawn_z + radius + 1):
+            for chunk, variant in chunk_variants_around(player_x, player_z, render_distance, chunk_size).items():
+                geometry_key = (chunk_tile_key(field, chunk[0], chunk[1], chunk_size), variant)
+                if geometry_key not in pack:
+                    wanted.setdefault(geometry_key, chunk)
+    print(f"{len(pack)} chunks already packed, {len(wanted)} to build")
+
+    # Neighbouring chunks go to the same worker, which keeps its terrain tiles warm
+    items = sorted(wanted.items(), key=lambda item: item[1])
+    batches = [items[start:start + 64] for start in range(0, len(items), 64)]
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=init_pregeneration_worker,
+        initargs=(GameConfig.world_path, GameConfig.terrain_seed)
+    ) as executor:
+        for done, results in enumerate(executor.map(build_chunk_batch, batches), 1):
+            for geometry_key, arrays in results:
+                pack.put(geometry_key, arrays)
+            if done % 16 == 0 or done == len(batches):
+                print(f"Packed {len(pack)} chunks ({done}/{len(batches)} batches)")
+    pack.close()
+
 class GameApp:
     def __init__(self):
+        bootstrap()
         window.title = 'CubeTrix'
         window.borderless = False
         window.fullscreen = False
@@ -1149,6 +2773,7 @@ class GameApp:
         window.position = (192, 108)
         # Set a valid icon if available
         # window.icon = 'assets/ursina.ico'  # Uncomment and set path if you have an icon
+        startup_profile.mark('window settings')
         # Initialize game
         self.game = ThinkingFieldsGame()
 
@@ -1156,5 +2781,33 @@ class GameApp:
         app.run()
 
 if __name__ == '__main__':
-    game_app = GameApp()
-    game_app.run()
+    parser = argparse.ArgumentParser(description='CubeTrix')
+    parser.add_argument('--world', help='play on a world directory made by --generate-world or --import-heightmap')
+    parser.add_argument('--generate-world', metavar='PATH', help='bake streamed terrain into a world directory and exit')
+    parser.add_argument('--world-size', type=int, default=16384, help='cells per side for --generate-world')
+    parser.add_argument('--seed', type=int, help='terrain seed; a fixed seed lets chunks be packed on disk')
+    parser.add_argument('--pregenerate', type=int, metavar='RADIUS',
+                        help='pack chunks for RADIUS chunks around spawn (needs --seed or --world) and exit')
+    parser.add_argument('--jobs', type=int, help='worker processes for --pregenerate (default: all cores)')
+    parser.add_argument('--import-heightmap', nargs=2, metavar=('SOURCE', 'PATH'),
+                        help='convert a .npy or raw DEM into a world directory and exit')
+    parser.add_argument('--raw-shape', type=int, nargs=2, metavar=('ROWS', 'COLS'), help='shape of a raw DEM')
+    parser.add_argument('--raw-dtype', default='float32', help='cell type of a raw DEM, e.g. <i2 or >f4')
+    parser.add_argument('--vertical-scale', type=float, default=1.0, help='DEM units to game height units')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='print how long each startup phase took, up to the first frame')
+    args = parser.parse_args()
+    GameConfig.world_path = args.world
+    GameConfig.terrain_seed = args.seed
+    GameConfig.profile_startup = args.profile_startup
+
+    if args.generate_world:
+        generate_world(args.generate_world, args.world_size, seed=args.seed)
+    elif args.import_heightmap:
+        import_heightmap(*args.import_heightmap, shape=args.raw_shape, dtype=args.raw_dtype,
+                         vertical_scale=args.vertical_scale)
+    elif args.pregenerate is not None:
+        pregenerate_chunks(args.pregenerate, jobs=args.jobs)
+    else:
+        game_app = GameApp()
+        game_app.run()
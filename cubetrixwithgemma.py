@@ -1,47 +1,217 @@
+import time
+STARTUP_TIME = time.perf_counter()  # Before the heavy imports, for the startup profile
+
 from ursina import *
 from ursina.prefabs.health_bar import HealthBar
+from panda3d.core import Texture as PandaTexture
 import numpy as np
-from scipy.ndimage import gaussian_filter
 import random
-from threading import Thread
-import time
+from threading import Lock, Thread
 import os
+import argparse
 import logging
 import queue
-import cv2
-from PIL import Image
 
 # Configure logging
 logging.basicConfig(level=logging.ERROR, format='%(levelname)s: %(message)s')
 logging.getLogger('comtypes').setLevel(logging.ERROR)
 
-# Initialize Ursina
-app = Ursina()
+# Ursina application and text-to-speech thread, created by bootstrap()
+app = None
+tts_engine = None
 
 # Global game instance
 game = None
 
-# Initialize webcam (for future use, e.g. falling boxes or other features)
-webcam_cap = cv2.VideoCapture(0)
-webcam_cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-webcam_cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+# Time spent in each startup phase, from launch to the first rendered frame. Phases are
+# marked as they end; --profile-startup prints the breakdown
+class StartupProfile:
+    def __init__(self, start):
+        self.start = start
+        self.last = start
+        self.phases = []  # (name, ms)
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, (now - self.last) * 1000))
+        self.last = now
+
+    def total(self):
+        return (self.last - self.start) * 1000
+
+    def report(self):
+        lines = [f'  {name:<20}{ms:9.1f} ms' for name, ms in self.phases]
+        lines.append(f'  {"total":<20}{self.total():9.1f} ms')
+        return '\n'.join(['Startup profile:'] + lines)
+
+startup_profile = StartupProfile(STARTUP_TIME)
+
+# Webcam frame sources. read() returns (ok, BGR uint8 frame) and may block until the next
+# frame is due; cameras pace themselves, video files and synthetic frames sleep to their
+# frame rate
+class VideoFrameSource:
+    def __init__(self, source=0, width=640, height=480):
+        import cv2
+        self.cv2 = cv2
+        self.capture = cv2.VideoCapture(source)
+        self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        self.is_file = not isinstance(source, int)
+        self.interval = 1 / (self.capture.get(cv2.CAP_PROP_FPS) or 30) if self.is_file else 0
+        self.next_frame = time.perf_counter()
+
+    def read(self):
+        if self.interval:
+            self.next_frame = wait_until(self.next_frame + self.interval, self.interval)
+        ok, frame = self.capture.read()
+        if not ok and self.is_file:
+            # Loop the video
+            self.capture.set(self.cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.capture.read()
+        return ok, frame
+
+    def release(self):
+        self.capture.release()
+
+class SyntheticFrameSource:
+    # Colour bars scrolling over a vertical gradient, for running without a camera
+    def __init__(self, width=640, height=480, fps=30):
+        self.width = width
+        self.height = height
+        self.interval = 1 / fps
+        self.next_frame = time.perf_counter()
+        self.frame_index = 0
+        bar = np.arange(width) * 8 // width
+        self.bars = np.stack(((bar & 1) * 255, np.zeros(width, dtype=np.int64), (bar & 4) * 63), axis=1).astype(np.uint8)
+        self.gradient = (np.arange(height) * 255 // height).astype(np.uint8)
+
+    def read(self):
+        self.next_frame = wait_until(self.next_frame + self.interval, self.interval)
+        frame = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        frame[:] = np.roll(self.bars, self.frame_index * 4, axis=0)
+        frame[:, :, 1] = self.gradient[:, None]
+        self.frame_index += 1
+        return True, frame
+
+    def release(self):
+        pass
+
+def wait_until(due, interval):
+    # Sleep until a frame is due; a source that fell more than a frame behind starts over
+    now = time.perf_counter()
+    if due < now - interval:
+        return now
+    time.sleep(max(0.0, due - now))
+    return due
+
+def open_frame_source(source):
+    if source == 'synthetic':
+        return SyntheticFrameSource()
+    return VideoFrameSource(source)
+
+# Webcam frames read on a background thread into a small ring buffer. The thread also
+# downscales each frame and turns it into RGB rows in texture order, so the main thread
+# only copies the newest frame into one reusable texture, at most upload_rate times a
+# second. Frames replaced before an upload took them count as dropped; uploads that found
+# nothing newer count as stale
+class WebcamStream:
+    def __init__(self, source, size=(160, 120), buffer_frames=3, upload_rate=15):
+        self.source = source
+        self.width, self.height = size
+        # With two or more slots the one being written is never the newest, which upload
+        # reads; a single slot would be overwritten mid-upload
+        buffer_frames = max(buffer_frames, 2)
+        self.frames = np.zeros((buffer_frames, self.height, self.width, 3), dtype=np.uint8)
+        self.lock = Lock()  # Guards captured
+        self.captured = 0  # Frames written to the ring so far
+        self.last_uploaded = 0  # captured at the last upload
+        self.uploaded = 0  # Frames uploaded so far
+        self.dropped = 0
+        self.stale = 0
+        self.read_errors = 0
+        self.upload_interval = 1 / upload_rate
+        self.last_upload = -inf
+        self.sample_shape = None  # Source frame shape the rows and columns below were picked for
+        self.rows = self.columns = None
+
+        self.panda_texture = PandaTexture('webcam')
+        self.panda_texture.setup_2d_texture(self.width, self.height, PandaTexture.T_unsigned_byte, PandaTexture.F_rgb)
+        self.texture = Texture(self.panda_texture)
+        self.texture._cached_image = None  # Ursina only sets this for textures it loads itself
+
+        self.running = True
+        self.thread = Thread(target=self.capture_frames)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def capture_frames(self):
+        while self.running:
+            try:
+                ok, frame = self.source.read()
+            except Exception as e:
+                logging.error(f"Webcam read failed: {e}")
+                ok = False
+            if not ok or frame is None:
+                self.read_errors += 1
+                time.sleep(0.1)
+                continue
+            if frame.shape != self.sample_shape:
+                # Nearest-pixel downscale, bottom row first as textures expect
+                self.sample_shape = frame.shape
+                self.rows = np.linspace(frame.shape[0] - 1, 0, self.height).astype(np.intp)
+                self.columns = np.linspace(0, frame.shape[1] - 1, self.width).astype(np.intp)
+            self.frames[self.captured % len(self.frames)] = frame[self.rows[:, None], self.columns, ::-1]
+            with self.lock:
+                self.captured += 1
+
+    def upload(self):
+        now = time.perf_counter()
+        if now - self.last_upload < self.upload_interval:
+            return False
+        self.last_upload = now
+        with self.lock:
+            captured = self.captured
+            if captured == self.last_uploaded:
+                self.stale += 1
+                return False
+            self.panda_texture.set_ram_image_as(self.frames[(captured - 1) % len(self.frames)], 'RGB')
+        self.dropped += captured - self.last_uploaded - 1
+        self.last_uploaded = captured
+        self.uploaded += 1
+        return True
+
+    def stats(self):
+        return {
+            'captured': self.captured, 'uploaded': self.uploaded, 'dropped': self.dropped,
+            'stale': self.stale, 'read_errors': self.read_errors
+        }
+
+    def close(self):
+        self.running = False
+        self.thread.join(timeout=1)
+        self.source.release()
 
 # Text-to-Speech Engine Initialization with Queue
 class TTSEngine:
     def __init__(self):
         self.queue = queue.Queue()
+        self.engine = None
+        self.failed = False
+        self.thread = Thread(target=self.run_engine)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def run_engine(self):
+        # The speech driver starts on this thread, so a slow one doesn't hold up startup.
+        # Lines queued meanwhile are spoken once it is ready
         try:
             import pyttsx3
             self.engine = pyttsx3.init()
             self.engine.setProperty('rate', 150)  # Slower speech rate for dramatic effect
-            self.thread = Thread(target=self.run_engine)
-            self.thread.daemon = True
-            self.thread.start()
         except Exception as e:
             print(f"TTS Initialization Error: {e}")
-            self.engine = None
-
-    def run_engine(self):
+            self.failed = True
+            return
         while True:
             text = self.queue.get()
             if text is None:
@@ -58,18 +228,37 @@ class TTSEngine:
                 logging.error(f"TTS Error during speaking: {e}")
 
     def enqueue(self, text):
-        if self.engine:
+        if not self.failed:
             self.queue.put(text)
 
-tts_engine = TTSEngine()
-
 def speak_async(text):
     try:
-        if game and game.tts_enabled and tts_engine.engine:
+        if game and game.tts_enabled and tts_engine is not None:
             tts_engine.enqueue(text)
     except Exception as e:
         print(f"TTS Error: {e}")
 
+def bootstrap():
+    # Creates what importing this module used to: the Ursina app and the text-to-speech
+    # thread. The webcam opens separately, on first use
+    global app, tts_engine
+    if app is None:
+        startup_profile.mark('imports')
+        app = Ursina()
+        app.taskMgr.add(finish_startup, 'finish-startup', sort=60)  # Runs after the frame is drawn
+        startup_profile.mark('ursina')
+    if tts_engine is None:
+        tts_engine = TTSEngine()
+        startup_profile.mark('text to speech')
+    return app
+
+def finish_startup(task):
+    startup_profile.mark('first frame')
+    if GameConfig.profile_startup:
+        print(f"First interactive frame {startup_profile.total():.0f} ms after launch")
+        print(startup_profile.report())
+    return task.done
+
 # Hardcoded Quotes (for pickups, enemy spawns, etc.)
 NARRATIVE_QUOTES = [
     "You stuck your finger to a USB port and woke up in the Matrix.",
@@ -145,6 +334,12 @@ class GameConfig:
     pickup_timer = 0
     gravity = -20  # Gravity constant
     jump_force = 15  # Jump force
+    webcam_source = None  # Camera index, video file or 'synthetic'; None leaves the webcam off
+    webcam_size = (160, 120)  # Frames are downscaled to this before upload
+    webcam_buffer_frames = 3  # Ring slots between capture and upload; at least 2
+    webcam_upload_rate = 15  # Max texture uploads per second
+    webcam_target = 'sky'  # Show the webcam on the 'sky' or on enemy 'cubes'
+    profile_startup = False  # Print startup phase timings after the first frame
 
     @classmethod
     def initialize_sounds(cls, game):
@@ -236,6 +431,7 @@ class ThinkingField:
         return self.apply_spatial_correlation(field)
 
     def apply_spatial_correlation(self, field):
+        from scipy.ndimage import gaussian_filter
         smoothed_field = gaussian_filter(field, sigma=self.correlation_length)
         smoothed_field *= self.amplitude / (smoothed_field.std() + 1e-7)
         return smoothed_field
@@ -293,6 +489,8 @@ class Enemy(Entity):
         color_choice = random.choice(color_options)
         super().__init__(model='cube', color=color_choice, scale=(size, size*2, size), position=position, collider='box')
         self.original_color = color_choice
+        if game.webcam is not None and GameConfig.webcam_target == 'cubes':
+            self.texture = game.webcam.texture
         self.health = 100
         self.speed = 6
         self.search_radius = 25
@@ -586,6 +784,18 @@ class ThinkingFieldsGame(Entity):
         # Create sky (unchanged from original)
         self.sky = Sky()
 
+        self.webcam = None
+        if GameConfig.webcam_source is not None:
+            try:
+                self.webcam = WebcamStream(
+                    open_frame_source(GameConfig.webcam_source), GameConfig.webcam_size,
+                    GameConfig.webcam_buffer_frames, GameConfig.webcam_upload_rate
+                )
+                if GameConfig.webcam_target == 'sky':
+                    self.sky.texture = self.webcam.texture
+            except Exception as e:
+                print(f"Webcam Initialization Error: {e}")
+
         # Initialize sounds
         GameConfig.initialize_sounds(self)
 
@@ -810,6 +1020,9 @@ class ThinkingFieldsGame(Entity):
                 self.enemies.remove(enemy)
 
     def update(self):
+        if self.webcam is not None:
+            self.webcam.upload()
+
         if not self.game_started or self.game_paused or self.game_over:
             return
 
@@ -872,10 +1085,13 @@ class ThinkingFieldsGame(Entity):
 
     def on_closing(self):
         self.game_over = True
+        if self.webcam is not None:
+            self.webcam.close()
         destroy(self)
 
 class GameApp(Entity):
     def __init__(self):
+        bootstrap()
         window.title = 'CubeTrix'
         window.borderless = False
         window.fullscreen = False
@@ -884,10 +1100,20 @@ class GameApp(Entity):
         window.size = (1536, 864)
         window.position = (192, 108)
         self.game = ThinkingFieldsGame()
+        startup_profile.mark('game')
 
     def run(self):
         app.run()
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='CubeTrix with Gemma')
+    parser.add_argument('--webcam', metavar='SOURCE', help="camera index, video file or 'synthetic'")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='print how long each startup phase took, up to the first frame')
+    args = parser.parse_args()
+    GameConfig.profile_startup = args.profile_startup
+    if args.webcam is not None:
+        GameConfig.webcam_source = int(args.webcam) if args.webcam.isdigit() else args.webcam
+
     game_app = GameApp()
     game_app.run()